@@ -0,0 +1,272 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from database import settings
+from http_client import get_http_session, http_timeout
+from url_utils import canonicalize_url
+from news_fetcher import FEED_USER_AGENT
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never article body
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "form", "button",
+    "nav", "header", "footer", "aside", "figcaption", "select", "textarea",
+}
+_BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "td", "div", "section", "article"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# class / id hints of boilerplate containers (comments, share bars, related links...)
+_BOILERPLATE_HINT = re.compile(
+    r"comment|share|social|related|recommend|subscribe|newsletter|promo|advert|\bads?\b|sidebar|breadcrumb|cookie|footer|menu",
+    re.IGNORECASE
+)
+_WHITESPACE = re.compile(r"\s+")
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+class ArticleTextParser(HTMLParser):
+    """Streaming boilerplate stripper
+    
+    Collects text blocks outside navigation / script / boilerplate containers,
+    tracking how much of each block is link text. Prefers blocks inside
+    <article> or <main> when the page has them.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack: List[tuple] = []  # (tag, skip, in_main)
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._link_depth = 0
+        self._text: List[str] = []
+        self._link_chars = 0
+        self.blocks: List[tuple] = []  # (text, link_chars, in_main)
+    
+    def _flush(self):
+        text = _WHITESPACE.sub(" ", "".join(self._text)).strip()
+        if text:
+            self.blocks.append((text, self._link_chars, self._main_depth > 0))
+        self._text = []
+        self._link_chars = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._text.append(" ")
+            return
+        
+        attrs = dict(attrs)
+        hints = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+        skip = tag in _SKIP_TAGS or (tag not in ("article", "main", "body") and bool(_BOILERPLATE_HINT.search(hints)))
+        in_main = tag in ("article", "main")
+        
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        self._stack.append((tag, skip, in_main))
+        if skip:
+            self._skip_depth += 1
+        if in_main:
+            self._main_depth += 1
+        if tag == "a":
+            self._link_depth += 1
+    
+    def handle_endtag(self, tag):
+        # Pop up to the matching start tag (tolerates unclosed elements)
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, skip, in_main = self._stack.pop()
+            if open_tag in _BLOCK_TAGS:
+                self._flush()
+            if skip:
+                self._skip_depth -= 1
+            if in_main:
+                self._main_depth -= 1
+            if open_tag == "a":
+                self._link_depth -= 1
+            if open_tag == tag:
+                break
+    
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._text.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+    
+    def text(self, max_chars: int) -> str:
+        self._flush()
+        blocks = self.blocks
+        if any(in_main for _, _, in_main in blocks):
+            blocks = [block for block in blocks if block[2]]
+        
+        paragraphs = []
+        length = 0
+        for text, link_chars, _ in blocks:
+            # Skip short fragments and link lists (CJK text is denser, lower bar)
+            min_length = 15 if _CJK.search(text) else 40
+            if len(text) < min_length or link_chars > len(text) * 0.5:
+                continue
+            paragraphs.append(text)
+            length += len(text) + 1
+            if length >= max_chars:
+                break
+        return "\n".join(paragraphs)[:max_chars]
+
+
+def extract_text(page_url: str) -> Optional[str]:
+    """Download an article page and return its main text
+    
+    Reading stops after ARTICLE_PAGE_MAX_BYTES or ARTICLE_PAGE_DEADLINE_SECONDS,
+    and the page is parsed while it downloads, so only the extracted text is
+    kept in memory.
+    """
+    deadline = time.monotonic() + settings.ARTICLE_PAGE_DEADLINE_SECONDS
+    response = get_http_session().get(
+        page_url,
+        headers={"User-Agent": FEED_USER_AGENT, "Accept": "text/html"},
+        timeout=http_timeout(settings.ARTICLE_PAGE_DEADLINE_SECONDS),
+        stream=True
+    )
+    try:
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return None
+        
+        parser = ArticleTextParser()
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        received = 0
+        for chunk in response.iter_content(chunk_size=32 * 1024):
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if received >= settings.ARTICLE_PAGE_MAX_BYTES or time.monotonic() >= deadline:
+                logger.debug(f"Article page truncated at {received} bytes: {page_url}")
+                break
+        parser.close()
+        
+        text = parser.text(settings.ARTICLE_TEXT_MAX_CHARS)
+        return text or None
+    finally:
+        response.close()
+
+
+class ArticleTextCache:
+    """Extracted article texts on disk
+    
+    Texts are stored once by content hash (<dir>/text/<hash>.txt); each canonical
+    URL maps to its text's hash (<dir>/url/<key[:2]>/<key>.json), so syndicated
+    copies of the same article share one file. Pages without usable text are
+    remembered with a null hash.
+    """
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+    
+    def _url_path(self, canonical_url: str) -> str:
+        key = hashlib.sha256(canonical_url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, "url", key[:2], key + ".json")
+    
+    def _text_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, "text", content_hash + ".txt")
+    
+    def lookup(self, canonical_url: str) -> tuple:
+        """Returns (found, text); text is None for pages without usable text"""
+        try:
+            with open(self._url_path(canonical_url), "r", encoding="utf-8") as f:
+                content_hash = json.load(f).get("content_hash")
+            if not content_hash:
+                return True, None
+            with open(self._text_path(content_hash), "r", encoding="utf-8") as f:
+                return True, f.read()
+        except (OSError, ValueError):
+            return False, None
+    
+    def store(self, canonical_url: str, text: Optional[str]):
+        content_hash = None
+        if text:
+            content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            self._write(self._text_path(content_hash), text)
+        self._write(self._url_path(canonical_url), json.dumps({"url": canonical_url, "content_hash": content_hash}))
+    
+    def _write(self, path: str, data: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+_cache_instance = None
+
+
+def get_article_text_cache() -> ArticleTextCache:
+    """Get singleton article text cache"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = ArticleTextCache(settings.ARTICLE_CACHE_DIR)
+    return _cache_instance
+
+
+def _extract_one(article: Dict, canonical_url: str) -> Optional[str]:
+    try:
+        text = extract_text(article["url"])
+    except Exception as e:
+        # Not cached, try again next time
+        logger.debug(f"Article extraction failed for {article['url']}: {str(e)}")
+        return None
+    get_article_text_cache().store(canonical_url, text)
+    return text
+
+
+def extract_article_texts(articles: List[Dict]) -> int:
+    """Add the extracted page text as article["full_text"] where available
+    
+    Pages are downloaded by a pool of ARTICLE_EXTRACT_CONCURRENCY workers; the
+    whole stage gives up after ARTICLE_EXTRACT_BUDGET_SECONDS and articles that
+    are not done by then keep their feed snippet. Returns the number of
+    articles with full text.
+    """
+    if not settings.ARTICLE_EXTRACTION_ENABLED:
+        return 0
+    
+    cache = get_article_text_cache()
+    pending = []
+    for article in articles:
+        if not article.get("url") or article.get("full_text"):
+            continue
+        canonical_url = article.get("canonical_url") or canonicalize_url(article["url"])
+        found, text = cache.lookup(canonical_url)
+        if found:
+            if text:
+                article["full_text"] = text
+            continue
+        pending.append((article, canonical_url))
+    
+    if pending:
+        workers = max(1, min(settings.ARTICLE_EXTRACT_CONCURRENCY, len(pending)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="article-extract")
+        try:
+            future_to_article = {
+                executor.submit(_extract_one, article, canonical_url): article
+                for article, canonical_url in pending
+            }
+            done, not_done = wait(future_to_article, timeout=settings.ARTICLE_EXTRACT_BUDGET_SECONDS)
+            for future in done:
+                text = future.result()
+                if text:
+                    future_to_article[future]["full_text"] = text
+            if not_done:
+                logger.info(f"Article extraction budget used up, {len(not_done)} pages skipped")
+        finally:
+            # Running downloads finish in the background (each is bounded by its own deadline)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return sum(1 for article in articles if article.get("full_text"))
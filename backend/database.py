@@ -27,6 +27,15 @@ class Settings(BaseSettings):
     NVIDIA_API_KEY: str = ""  # NVIDIA API Key
     NVIDIA_MODEL: str = "z-ai/glm4.7"  # GLM model name
     
+    # LLM batching
+    LLM_BATCH_SIZE: int = 8  # 一次请求中摘要的新闻条数（1 = 每条单独请求）
+    LLM_BATCH_CONTENT_CHARS: int = 800  # 批量请求中每条新闻内容的最大字符数
+    LLM_FULL_TEXT_CHARS: int = 2500  # 有抓取的正文时，每条新闻交给大模型的最大字符数（批量与单条请求）
+    LLM_MAX_CONCURRENCY: int = 4  # 每个LLM服务同时进行的最大请求数（DashScope / NVIDIA）
+    OLLAMA_MAX_CONCURRENCY: int = 1  # 本地Ollama同时进行的最大请求数（取决于 OLLAMA_NUM_PARALLEL）
+    LLM_CACHE_ENABLED: bool = True  # 缓存LLM输出（相同内容不再重复调用LLM）
+    LLM_CACHE_MAX_BYTES: int = 50 * 1024 * 1024  # LLM输出缓存上限（字节），超出后淘汰最久未使用的条目
+    
     # Email
     RESEND_API_KEY: str = ""
     FROM_EMAIL: str = "noreply@dailydigest.com"
@@ -48,6 +57,86 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
+    # HTTP client (shared connection pool)
+    HTTP_POOL_CONNECTIONS: int = 32  # 缓存连接池的主机数量
+    HTTP_POOL_MAXSIZE: int = 8  # 每个主机的最大连接数
+    HTTP_CONNECT_TIMEOUT: float = 5.0  # 建立连接超时（秒）
+    NEWS_API_TIMEOUT: int = 10  # GNews / NewsData 读取超时（秒）
+    NEWS_API_MAX_BYTES: int = 2097152  # GNews / NewsData 响应体上限（字节）
+    NEWS_API_DEADLINE_SECONDS: int = 20  # GNews / NewsData 下载总时长上限（秒）
+    OLLAMA_TIMEOUT: int = 120  # Ollama 摘要请求超时（秒）
+    OLLAMA_RELEVANCE_TIMEOUT: int = 30  # Ollama 相关性评估超时（秒）
+    
+    # HTTP record / replay fixtures (offline benchmarking)
+    HTTP_FIXTURE_MODE: str = "off"  # "off", "record" 或 "replay"
+    HTTP_FIXTURE_DIR: str = "./fixtures/http"  # 录制文件目录
+    HTTP_FIXTURE_LATENCY_MS: int = 0  # 回放时模拟的延迟（毫秒），-1 = 使用录制时的实际耗时
+    
+    # GNews / NewsData quota
+    GNEWS_DAILY_QUOTA: int = 100  # GNews 每日请求上限（0 = 不限制），免费版为100
+    NEWSDATA_DAILY_QUOTA: int = 200  # NewsData 每日请求上限（0 = 不限制），免费版为200
+    NEWS_API_CACHE_TTL_SECONDS: int = 1800  # 同一主题的API结果缓存时长（秒）
+    NEWS_API_BATCH_SIZE: int = 5  # 每日更新时合并为一个 OR 查询的主题数量（1 = 不合并）
+    NEWS_API_MAX_PAGE_SIZE: int = 10  # 合并查询单次最多返回条数（免费版上限为10，付费版可调大）
+    
+    # RSS fetching
+    RSS_FETCH_CONCURRENCY: int = 6  # 每个主题同时抓取的RSS源数量（1 = 顺序抓取）
+    RSS_FETCH_TIMEOUT: int = 15  # 单个RSS源请求超时（秒）
+    RSS_ENTRIES_PER_FEED: int = 16  # 每个RSS源解析的条目数（同一刷新周期内各主题共用这次下载）
+    RSS_PARSE_MODE: str = "stream"  # "stream"（边下载边解析，够数即停止）或 "feedparser"（完整解析）
+    RSS_PARSE_PROCESSES: int = 0  # 解析RSS的进程数（0 = 在抓取线程内解析）
+    RSS_CONDITIONAL_GET: bool = True  # 使用 ETag / Last-Modified 条件请求，304 时重放上次解析的条目
+    RSS_ENTRY_CACHE_FEEDS: int = 1000  # 内存中保留最近解析条目的RSS源数量（用于304重放）
+    RSS_MAX_BYTES: int = 5242880  # 单个RSS源响应体上限（解压后字节数），超过视为抓取失败
+    RSS_DOWNLOAD_DEADLINE_SECONDS: int = 30  # 单个RSS源下载总时长上限（秒）
+    FEED_CIRCUIT_FAILURE_THRESHOLD: int = 3  # 连续失败多少次后暂停抓取该RSS源
+    FEED_CIRCUIT_RETRY_SECONDS: int = 3600  # 暂停多久后允许一次试探请求（秒）
+    
+    # Near-duplicate detection (SimHash)
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 3  # 汉明距离不超过该值视为重复（0-3）
+    NEAR_DUPLICATE_LOOKBACK_DAYS: int = 2  # 与最近几天已缓存的新闻比较
+    
+    # Free-text topic index
+    TOPIC_INDEX_MAX_DOCS: int = 5000  # 索引保留的最多条目数
+    TOPIC_INDEX_MAX_AGE_HOURS: int = 48  # 条目在索引中保留的时长（小时）
+    TOPIC_INDEX_MIN_COVERAGE: float = 0.5  # 条目至少包含主题中多少比例的词（CJK按双字）才算匹配
+    
+    # Article thumbnails (og:image enrichment + local image proxy)
+    IMAGE_PROXY_ENABLED: bool = True  # 缓存新闻配图到本地，并通过 /api/news/image 提供
+    IMAGE_CACHE_DIR: str = "./data/image_cache"  # 配图缓存目录（docker 中 data 目录已挂载）
+    IMAGE_ENRICH_CONCURRENCY: int = 8  # 同时抓取配图的数量
+    IMAGE_FETCH_TIMEOUT: int = 10  # 抓取文章页面/图片的超时（秒）
+    IMAGE_PAGE_MAX_BYTES: int = 262144  # 查找 og:image 时最多读取的页面字节数
+    IMAGE_MAX_BYTES: int = 2097152  # 单张图片最大字节数，超过则不缓存
+    
+    # Full-text article extraction
+    ARTICLE_EXTRACTION_ENABLED: bool = False  # 抓取文章正文代替RSS摘要片段交给大模型
+    ARTICLE_CACHE_DIR: str = "./data/article_cache"  # 正文缓存目录
+    ARTICLE_EXTRACT_CONCURRENCY: int = 4  # 同时抓取正文的页面数
+    ARTICLE_EXTRACT_BUDGET_SECONDS: int = 30  # 每个主题正文抓取的总时长上限（秒），超时的文章使用摘要片段
+    ARTICLE_PAGE_DEADLINE_SECONDS: int = 10  # 单个页面的下载时长上限（秒）
+    ARTICLE_PAGE_MAX_BYTES: int = 1572864  # 单个页面最多读取的字节数
+    ARTICLE_TEXT_MAX_CHARS: int = 4000  # 正文最多保留的字符数
+    
+    # Adaptive feed polling
+    FEED_POLLING_ENABLED: bool = True  # 按RSS源更新频率自动轮询
+    FEED_POLL_TICK_MINUTES: int = 5  # 检查到期RSS源的间隔（分钟）
+    FEED_POLL_MIN_MINUTES: int = 15  # 最短轮询间隔（分钟）
+    FEED_POLL_MAX_MINUTES: int = 1440  # 最长轮询间隔（分钟）
+    FEED_POLL_DEFAULT_MINUTES: int = 120  # 无法估计更新频率时的默认间隔（分钟）
+    
+    # WebSub (push instead of polling for feeds that advertise a hub)
+    WEBSUB_ENABLED: bool = False  # 需要 PUBLIC_BASE_URL 能被 hub 从公网访问
+    PUBLIC_BASE_URL: str = ""  # 后端的公网地址，例如 https://dailynews.domtang.asia
+    WEBSUB_HUB_OVERRIDE: str = ""  # 测试用：所有RSS源都使用该 hub（例如本地 hub）
+    WEBSUB_LEASE_SECONDS: int = 864000  # 申请的订阅租期（秒）
+    WEBSUB_RENEW_BEFORE_SECONDS: int = 86400  # 租期到期前多久续订（秒）
+    WEBSUB_RENEW_MINUTES: int = 30  # 检查订阅/续订的间隔（分钟）
+    WEBSUB_MAX_PUSH_BYTES: int = 5242880  # 单次推送内容上限（字节）
+    
+    # Admin
+    ADMIN_EMAILS: str = ""  # 管理员邮箱，逗号分隔（可访问 /api/admin 接口）
+    
     # Scheduler
     DAILY_UPDATE_HOUR: int = 8
     DAILY_UPDATE_MINUTE: int = 0
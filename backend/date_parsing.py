@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# RFC 822 zone names (unknown names are treated as UTC, like email.utils)
+_ZONES = {
+    "UT": 0, "UTC": 0, "GMT": 0, "Z": 0,
+    "EST": -5, "EDT": -4, "CST": -6, "CDT": -5,
+    "MST": -7, "MDT": -6, "PST": -8, "PDT": -7,
+}
+
+# "Mon, 06 Jan 2025 10:00:00 +0800" / "6 Jan 25 10:00 GMT"
+_RFC822_RE = re.compile(
+    r"^\s*(?:[A-Za-z]{3},?\s+)?(\d{1,2})\s+([A-Za-z]{3})[a-z]*\.?\s+(\d{2,4})\s+"
+    r"(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{2}:?\d{2}|[A-Za-z]{1,5})?\s*$"
+)
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Convert to UTC and drop tzinfo (naive values are assumed to be UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_rfc822(value: str) -> Optional[datetime]:
+    """RFC 822 / RFC 2822 dates, the pubDate format of RSS 2.0"""
+    match = _RFC822_RE.match(value)
+    if not match:
+        return None
+    day, month_name, year, hour, minute, second, zone = match.groups()
+    month = _MONTHS.get(month_name[:3].lower())
+    if not month:
+        return None
+    
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+    
+    offset = 0
+    if zone:
+        if zone[0] in "+-":
+            digits = zone[1:].replace(":", "")
+            offset = int(digits[:2]) * 60 + int(digits[2:])
+            if zone[0] == "-":
+                offset = -offset
+        else:
+            offset = _ZONES.get(zone.upper(), 0) * 60
+    
+    parsed = datetime(year, month, int(day), int(hour), int(minute), int(second or 0))
+    return parsed - timedelta(minutes=offset)
+
+
+def parse_iso8601(value: str) -> Optional[datetime]:
+    """RFC 3339 / ISO 8601 dates (Atom, JSON APIs)"""
+    value = value.strip()
+    if len(value) < 10 or not value[:4].isdigit() or value[4] != "-":
+        return None
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    try:
+        return to_utc_naive(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def parse_generic(value: str) -> Optional[datetime]:
+    """Slow general-purpose fallback for anything else"""
+    from dateutil import parser
+    return to_utc_naive(parser.parse(value))
+
+
+def from_struct_time(value: time.struct_time) -> Optional[datetime]:
+    """feedparser *_parsed values are already normalized to UTC"""
+    try:
+        return datetime(*value[:6])
+    except (TypeError, ValueError):
+        return None
+
+
+_PARSERS: Dict[str, Callable[[str], Optional[datetime]]] = {
+    "rfc822": parse_rfc822,
+    "iso8601": parse_iso8601,
+    "generic": parse_generic,
+}
+
+
+class DateParser:
+    """Date parser with fast paths and a per-source format cache
+    
+    The parser that last worked for a source (e.g. a feed URL) is tried first,
+    so a feed's dates usually parse on the first attempt. All results are
+    naive UTC datetimes, the format stored in the database.
+    """
+    
+    def __init__(self):
+        self._formats: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def parse(self, value: Optional[str], source: Optional[str] = None) -> Optional[datetime]:
+        if not value:
+            return None
+        
+        cached = self._formats.get(source) if source else None
+        order = [cached] + [name for name in _PARSERS if name != cached] if cached else list(_PARSERS)
+        
+        for name in order:
+            try:
+                parsed = _PARSERS[name](value)
+            except (ValueError, OverflowError, TypeError):
+                parsed = None
+            if parsed is not None:
+                if source and name != cached:
+                    with self._lock:
+                        self._formats[source] = name
+                return parsed
+        
+        logger.debug(f"Unparseable date: {value!r}")
+        return None
+
+
+# Process-wide parser (each worker process gets its own cache)
+date_parser = DateParser()
+
+
+def parse_datetime(value: Optional[str], source: Optional[str] = None) -> Optional[datetime]:
+    """Parse a date string into a naive UTC datetime"""
+    return date_parser.parse(value, source)
@@ -0,0 +1,117 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+
+# SimHash fingerprint size in bits
+FINGERPRINT_BITS = 64
+
+# Fingerprints are split into bands for candidate lookup. With 4 bands of 16
+# bits, two fingerprints within 3 bits of each other share at least one band.
+BAND_COUNT = 4
+BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Texts with fewer features give unreliable fingerprints and are never
+# treated as near-duplicates
+MIN_FEATURES = 4
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# " - Reuters", " | CNBC", " – Yahoo Finance": short publisher suffix on titles
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,30}$")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop HTML tags and collapse whitespace"""
+    text = _TAG_RE.sub(" ", text or "")
+    return " ".join(text.lower().split())
+
+
+def extract_features(text: str) -> Dict[str, int]:
+    """Word tokens (latin) and character bigrams (CJK) with their counts"""
+    normalized = normalize_text(text)
+    features: Dict[str, int] = {}
+    for word in _WORD_RE.findall(normalized):
+        features[word] = features.get(word, 0) + 1
+    for run in _CJK_RE.findall(normalized):
+        if len(run) == 1:
+            features[run] = features.get(run, 0) + 1
+        for i in range(len(run) - 1):
+            bigram = run[i:i + 2]
+            features[bigram] = features.get(bigram, 0) + 1
+    return features
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of a text, None if the text is too short to fingerprint"""
+    features = extract_features(text)
+    if len(features) < MIN_FEATURES:
+        return None
+    
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if digest >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def strip_source_suffix(title: str) -> str:
+    """Drop a trailing publisher name, e.g. "Fed raises rates - Reuters" """
+    match = _SOURCE_SUFFIX_RE.search(title or "")
+    return title[:match.start()] if match else (title or "")
+
+
+def article_fingerprint(title: str, content: str) -> Optional[int]:
+    """Fingerprint of an article from its title and the beginning of its content"""
+    return simhash(f"{strip_source_suffix(title)} {(content or '')[:500]}")
+
+
+def fingerprint_to_hex(fingerprint: Optional[int]) -> Optional[str]:
+    return f"{fingerprint:016x}" if fingerprint is not None else None
+
+
+def fingerprint_from_hex(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value, 16) if value else None
+    except ValueError:
+        return None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Banded SimHash index for near-duplicate lookup"""
+    
+    def __init__(self, max_distance: int = 3, fingerprints: Iterable[int] = ()):
+        self.max_distance = max_distance
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(BAND_COUNT)]
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+    
+    def _band_keys(self, fingerprint: int):
+        for band in range(BAND_COUNT):
+            yield band, fingerprint >> (band * BAND_BITS) & BAND_MASK
+    
+    def add(self, fingerprint: int):
+        for band, key in self._band_keys(fingerprint):
+            self._bands[band].setdefault(key, []).append(fingerprint)
+    
+    def find_near(self, fingerprint: int) -> Optional[int]:
+        """Return an indexed fingerprint within max_distance bits, if any"""
+        for band, key in self._band_keys(fingerprint):
+            for candidate in self._bands[band].get(key, ()):
+                if hamming_distance(fingerprint, candidate) <= self.max_distance:
+                    return candidate
+        return None
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FeedFetchCycle:
+    """Feed download memo scoped to one refresh cycle
+    
+    Every unique feed URL is downloaded once per cycle, no matter how many topics
+    reference it. Later topics (or concurrent threads) get a copy of the parsed
+    entries from the first download.
+    """
+    
+    def __init__(self):
+        self._results: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.downloads = 0
+        self.reuses = 0
+    
+    def fetch(self, feed_url: str, fetch_fn: Callable[[], Optional[List[Dict]]]) -> Optional[List[Dict]]:
+        """Return the entries for feed_url, calling fetch_fn only on first use"""
+        with self._lock:
+            future = self._results.get(feed_url)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._results[feed_url] = future
+                self.downloads += 1
+            else:
+                self.reuses += 1
+        
+        if is_owner:
+            try:
+                future.set_result(fetch_fn())
+            except Exception as e:
+                future.set_exception(e)
+        
+        result = future.result()
+        if result is None:
+            return None
+        # Copy so one topic's processing never mutates another topic's articles
+        return [dict(article) for article in result]
+    
+    def stats(self) -> Dict:
+        return {"feeds_downloaded": self.downloads, "feeds_reused": self.reuses}
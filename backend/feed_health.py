@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from database import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+STATE_CLOSED = "closed"  # 正常抓取
+STATE_OPEN = "open"  # 连续失败，暂停抓取
+STATE_HALF_OPEN = "half_open"  # 冷却结束，允许一次试探请求
+
+
+class FeedHealth:
+    """Health statistics of a single feed URL"""
+    
+    def __init__(self, feed_url: str):
+        self.feed_url = feed_url
+        self.state = STATE_CLOSED
+        self.total_requests = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.opened_at: Optional[float] = None  # time.monotonic() when the circuit opened
+        self.latencies = deque(maxlen=100)  # Recent request latencies (seconds)
+    
+    def p95_latency(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = max(0, int(round(0.95 * len(ordered))) - 1)
+        return ordered[index]
+    
+    def to_dict(self) -> Dict:
+        p95 = self.p95_latency()
+        return {
+            "feed_url": self.feed_url,
+            "state": self.state,
+            "total_requests": self.total_requests,
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "success_rate": round(self.success_count / self.total_requests, 3) if self.total_requests else None,
+            "consecutive_failures": self.consecutive_failures,
+            "p95_latency_ms": int(p95 * 1000) if p95 is not None else None,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at.isoformat() if self.last_error_at else None,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+        }
+
+
+class FeedHealthTracker:
+    """Per-feed health tracking with a circuit breaker
+    
+    After FEED_CIRCUIT_FAILURE_THRESHOLD consecutive failures a feed is skipped
+    for FEED_CIRCUIT_RETRY_SECONDS, then a single half-open request decides
+    whether it is closed again or stays open for another window.
+    """
+    
+    def __init__(self, failure_threshold: int, retry_seconds: int):
+        self.failure_threshold = failure_threshold
+        self.retry_seconds = retry_seconds
+        self._feeds: Dict[str, FeedHealth] = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, feed_url: str) -> FeedHealth:
+        health = self._feeds.get(feed_url)
+        if health is None:
+            health = FeedHealth(feed_url)
+            self._feeds[feed_url] = health
+        return health
+    
+    def allow_request(self, feed_url: str) -> bool:
+        """Check whether a feed may be fetched now"""
+        with self._lock:
+            health = self._get(feed_url)
+            if health.state == STATE_CLOSED:
+                return True
+            if health.state == STATE_HALF_OPEN:
+                # A probe request is already in flight
+                return False
+            if time.monotonic() - health.opened_at >= self.retry_seconds:
+                health.state = STATE_HALF_OPEN
+                logger.info(f"Feed circuit half-open, probing: {feed_url}")
+                return True
+            return False
+    
+    def record_success(self, feed_url: str, latency: float):
+        with self._lock:
+            health = self._get(feed_url)
+            health.total_requests += 1
+            health.success_count += 1
+            health.consecutive_failures = 0
+            health.last_success_at = datetime.utcnow()
+            health.latencies.append(latency)
+            if health.state != STATE_CLOSED:
+                logger.info(f"Feed circuit closed, feed recovered: {feed_url}")
+            health.state = STATE_CLOSED
+            health.opened_at = None
+    
+    def record_failure(self, feed_url: str, error: str, latency: float):
+        with self._lock:
+            health = self._get(feed_url)
+            health.total_requests += 1
+            health.failure_count += 1
+            health.consecutive_failures += 1
+            health.last_error = error[:500]
+            health.last_error_at = datetime.utcnow()
+            health.latencies.append(latency)
+            if health.state == STATE_HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                if health.state != STATE_OPEN:
+                    logger.warning(
+                        f"Feed circuit opened after {health.consecutive_failures} failures, "
+                        f"skipping for {self.retry_seconds}s: {feed_url}"
+                    )
+                health.state = STATE_OPEN
+                health.opened_at = time.monotonic()
+    
+    def reset(self, feed_url: Optional[str] = None):
+        """Forget health state for one feed, or for all feeds"""
+        with self._lock:
+            if feed_url is None:
+                self._feeds.clear()
+            else:
+                self._feeds.pop(feed_url, None)
+    
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [health.to_dict() for health in self._feeds.values()]
+
+
+# Singleton instance
+_tracker_instance = None
+_tracker_lock = threading.Lock()
+
+
+def get_feed_health() -> FeedHealthTracker:
+    """Get singleton feed health tracker"""
+    global _tracker_instance
+    if _tracker_instance is None:
+        with _tracker_lock:
+            if _tracker_instance is None:
+                _tracker_instance = FeedHealthTracker(
+                    failure_threshold=settings.FEED_CIRCUIT_FAILURE_THRESHOLD,
+                    retry_seconds=settings.FEED_CIRCUIT_RETRY_SECONDS
+                )
+    return _tracker_instance
@@ -0,0 +1,119 @@
+# Feed parsing helpers. Everything here is plain module-level functions with
+# picklable inputs/outputs so parsing can also run in a worker process.
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import feedparser
+from feed_stream import stream_parse_feed
+from date_parsing import from_struct_time, parse_datetime
+
+
+def generate_entry_id(feed_url: str, entry) -> str:
+    """Generate unique entry ID from feed_url + guid/link"""
+    # Try guid first, then link, then id
+    guid = entry.get("id") or entry.get("guid") or entry.get("link", "")
+    
+    if not guid:
+        # Last resort: use title + url hash
+        title = entry.get("title", "")
+        url = entry.get("link", "")
+        guid = f"{title}:{url}"
+    
+    # Create hash from feed_url + guid
+    combined = f"{feed_url}:{guid}"
+    entry_id = hashlib.sha256(combined.encode('utf-8')).hexdigest()
+    return entry_id
+
+
+def extract_image_from_entry(entry) -> Optional[str]:
+    """Extract image URL from RSS entry"""
+    # Try media:content
+    if hasattr(entry, 'media_content') and entry.media_content:
+        return entry.media_content[0].get('url')
+    
+    # Try media:thumbnail
+    if hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
+        return entry.media_thumbnail[0].get('url')
+    
+    # Try enclosures
+    if hasattr(entry, 'enclosures') and entry.enclosures:
+        for enclosure in entry.enclosures:
+            if 'image' in enclosure.get('type', ''):
+                return enclosure.get('url')
+    
+    return None
+
+
+def entry_published_at(entry, feed_url: str) -> Optional[datetime]:
+    """Publish time of an entry as naive UTC
+    
+    Uses feedparser's already parsed struct_time when present, otherwise parses
+    the raw string (the format that worked for this feed is tried first).
+    """
+    for key in ("published", "updated"):
+        parsed = entry.get(f"{key}_parsed")
+        if parsed:
+            return from_struct_time(parsed)
+        if entry.get(key):
+            return parse_datetime(entry.get(key), source=feed_url)
+    return None
+
+
+def entries_to_articles(feed, feed_url: str, max_articles: int) -> List[Dict]:
+    """Convert parsed feed entries to plain article dicts"""
+    articles = []
+    source = feed.feed.get("title") or "RSS Feed"
+    
+    for entry in feed.entries[:max_articles]:
+        # Don't filter by topic keyword, keep all articles
+        title = entry.get("title", "")
+        summary = entry.get("summary", "")
+        
+        # Skip empty articles
+        if not title and not summary:
+            continue
+        
+        articles.append({
+            "title": title,
+            "url": entry.get("link", ""),
+            "source": source,
+            "published_at": entry_published_at(entry, feed_url),
+            "content": summary,
+            "image_url": extract_image_from_entry(entry),
+            "entry_id": generate_entry_id(feed_url, entry),  # Unique ID for RSS articles
+            "feed_url": feed_url  # Add feed_url for tracking
+        })
+    
+    return articles
+
+
+def check_feed(feed):
+    """Raise if the parse result is not a feed at all (HTML error page, broken XML...)"""
+    if not feed.entries and feed.get("bozo"):
+        raise ValueError(f"Invalid feed: {feed.get('bozo_exception')}")
+
+
+def feed_links(feed) -> Dict[str, str]:
+    """Feed-level link relations, e.g. {"hub": ..., "self": ...} for WebSub"""
+    links = {}
+    for link in feed.feed.get("links", []):
+        rel, href = link.get("rel"), link.get("href")
+        if rel and href:
+            links.setdefault(rel, href)
+    return links
+
+
+def parse_feed_articles(
+    body: bytes,
+    feed_url: str,
+    max_articles: int,
+    response_headers: Optional[Dict] = None,
+    stream: bool = True
+) -> Tuple[List[Dict], Dict[str, str]]:
+    """Parse a downloaded feed body into article dicts and feed links (process pool entry point)"""
+    if stream:
+        feed = stream_parse_feed([body], max_articles, response_headers=response_headers)
+    else:
+        feed = feedparser.parse(body, response_headers=response_headers)
+    check_feed(feed)
+    return entries_to_articles(feed, feed_url, max_articles), feed_links(feed)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, List, Optional, Set
+from database import SessionLocal, settings
+from models import FeedState
+from feed_state import FETCH_ERROR, FETCH_NOT_MODIFIED
+from date_parsing import to_utc_naive
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent entries used to estimate a feed's publish rate
+PUBLISH_RATE_SAMPLE_SIZE = 20
+
+# Poll less often when a feed keeps answering 304 / has nothing new
+NOT_MODIFIED_BACKOFF = 1.5
+# Poll less often while a feed keeps failing
+ERROR_BACKOFF = 2
+
+
+def clamp_poll_interval(minutes: float) -> int:
+    return int(max(settings.FEED_POLL_MIN_MINUTES, min(settings.FEED_POLL_MAX_MINUTES, minutes)))
+
+
+def estimate_poll_interval(published_times: List[datetime]) -> Optional[int]:
+    """Estimate a polling interval (minutes) from entry publish times
+    
+    Uses the median gap between consecutive recent entries, so a feed posting
+    hourly is polled about hourly and a weekly blog at the max interval.
+    Returns None when there are not enough timestamps to tell.
+    """
+    times = sorted({to_utc_naive(t) for t in published_times if t}, reverse=True)
+    times = times[:PUBLISH_RATE_SAMPLE_SIZE]
+    if len(times) < 2:
+        return None
+    
+    gaps = [(newer - older).total_seconds() / 60 for newer, older in zip(times, times[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    if not gaps:
+        return None
+    
+    return clamp_poll_interval(median(gaps))
+
+
+def get_due_feeds(feed_urls: List[str], now: datetime) -> Set[str]:
+    """Return the feeds whose next poll time has passed (or were never polled)"""
+    if not feed_urls:
+        return set()
+    
+    db = SessionLocal()
+    try:
+        states = db.query(FeedState.feed_url, FeedState.next_poll_at).filter(
+            FeedState.feed_url.in_(feed_urls)
+        ).all()
+        scheduled = {url: next_poll_at for url, next_poll_at in states}
+        return {
+            url for url in feed_urls
+            if scheduled.get(url) is None or scheduled[url] <= now
+        }
+    finally:
+        db.close()
+
+
+def schedule_next_poll(feed_url: str, status: str, articles: List[Dict], now: datetime) -> int:
+    """Learn the feed's publish rate from a poll result and store the next poll time
+    
+    Args:
+        feed_url: Feed URL
+        status: Fetch status (FETCH_OK, FETCH_NOT_MODIFIED or FETCH_ERROR)
+        articles: Articles of the feed (replayed entries on FETCH_NOT_MODIFIED)
+        now: Current time (naive UTC)
+    
+    Returns:
+        int: New polling interval in minutes
+    """
+    db = SessionLocal()
+    try:
+        state = db.query(FeedState).filter(FeedState.feed_url == feed_url).first()
+        if not state:
+            state = FeedState(feed_url=feed_url)
+            db.add(state)
+        
+        current = state.poll_interval_minutes or settings.FEED_POLL_DEFAULT_MINUTES
+        
+        if status == FETCH_ERROR:
+            # Failing feed: back off faster, the circuit breaker handles the rest
+            interval = clamp_poll_interval(current * ERROR_BACKOFF)
+        elif status == FETCH_NOT_MODIFIED:
+            interval = clamp_poll_interval(current * NOT_MODIFIED_BACKOFF)
+        else:
+            published_times = [a.get("published_at") for a in articles if a.get("published_at")]
+            latest_entry = max((to_utc_naive(t) for t in published_times), default=None)
+            
+            if latest_entry and state.last_entry_at and latest_entry <= state.last_entry_at:
+                # Nothing new: slowly back off
+                interval = clamp_poll_interval(current * NOT_MODIFIED_BACKOFF)
+            else:
+                interval = estimate_poll_interval(published_times) or clamp_poll_interval(current)
+            
+            if latest_entry and (not state.last_entry_at or latest_entry > state.last_entry_at):
+                state.last_entry_at = latest_entry
+        state.poll_interval_minutes = interval
+        state.next_poll_at = now + timedelta(minutes=interval)
+        db.commit()
+        return interval
+    except Exception as e:
+        logger.error(f"Failed to schedule next poll for {feed_url}: {str(e)}")
+        db.rollback()
+        return settings.FEED_POLL_DEFAULT_MINUTES
+    finally:
+        db.close()
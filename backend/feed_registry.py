@@ -0,0 +1,203 @@
+import threading
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import CustomRSSFeed, Feed
+from url_utils import normalize_feed_url
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Built-in RSS feed sources per topic (read-only)
+DEFAULT_RSS_FEEDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "科技": (
+        "https://www.theverge.com/rss/index.xml",
+        "https://techcrunch.com/feed/",
+        "https://www.wired.com/feed/rss",
+        "https://www.engadget.com/rss.xml",
+    ),
+    "AI": (
+        "https://www.artificialintelligence-news.com/feed/",
+        "https://www.technologyreview.com/feed/",
+        "https://www.vox.com/rss/index.xml",
+        "https://www.reddit.com/r/artificial.rss",
+    ),
+    "财经": (
+        "https://www.economist.com/business/rss.xml",
+        "https://www.marketwatch.com/rss/topstories",
+        "https://finance.yahoo.com/rss/topstories",
+        "https://www.bloomberg.com/feeds/news.rss",
+    ),
+    "股市": (
+        "https://finance.yahoo.com/rss/finance/rssindex",
+        "https://www.cnbc.com/id/100003114/device/rss/rss.html",
+    ),
+    "国际时事": (
+        "https://feeds.bbci.co.uk/news/world/rss.xml",
+        "https://www.nytimes.com/svc/collections/v1/publish/https://www.nytimes.com/section/world/rss.xml",
+        "https://www.reddit.com/r/worldnews.rss",
+        "https://www.vox.com/rss/index.xml",
+    ),
+    "国际": (
+        "https://feeds.bbci.co.uk/news/world/rss.xml",
+        "https://www.reddit.com/r/worldnews.rss",
+    ),
+    "科学": (
+        "https://www.nature.com/nature.rss",
+        "https://www.science.org/rss/news_current.xml",
+        # removed unstable scientificamerican feed, keep Nature/Science/ScienceDaily
+        "https://www.sciencedaily.com/rss/all.xml",
+    ),
+    "娱乐": (
+        "https://www.theguardian.com/uk/culture/rss",
+        "https://www.indiewire.com/feed/rss",
+        "https://www.variety.com/feed/",
+    ),
+    "体育": (
+        "https://www.espn.com/espn/rss/news",
+        "https://feeds.bbci.co.uk/sport/rss.xml",
+        "https://sports.yahoo.com/rss/",
+        "https://www.cbssports.com/rss/headlines/",
+    ),
+    "搞笑": (
+        "https://www.theonion.com/rss",
+        "https://www.boredpanda.com/feed/",
+        "https://www.cheezburger.com/rss",
+    ),
+    "奇闻": (
+        "https://nypost.com/feed/",
+        "https://www.mirror.co.uk/news/rss.xml",
+        "https://www.telegraph.co.uk/news/rss.xml",
+        "https://www.nytimes.com/services/xml/rss/nyt/HomePage.xml",
+    ),
+    # 中文技术/编程/开发者社区（强烈推荐）- 每个RSS源作为独立主题
+    "阮一峰的网络日志": (
+        "https://www.ruanyifeng.com/blog/atom.xml",
+    ),
+    "酷壳 CoolShell": (
+        "https://coolshell.cn/feed",
+    ),
+    "美团技术团队": (
+        "https://tech.meituan.com/feed",
+    ),
+    "少数派（数字生产力）": (
+        "https://sspai.com/feed",
+    ),
+    "玉伯的博客/蚂蚁体验": (
+        "https://www.yuque.com/yubo/blog/rss",
+    ),
+    "粥里有勺糖": (
+        "https://www.zhihu.com/people/shao-nian-ge-xing-68-13/posts/rss",
+    ),
+    "黑泽的博客": (
+        "https://heizex.com/feed",
+    ),
+    "独立开发者周刊": (
+        "https://indiehackers.feeds.cn/rss",
+    ),
+})
+
+
+class FeedRegistrySnapshot:
+    """Immutable topic -> feed URLs mapping of one registry version"""
+    
+    def __init__(self, version: int, topic_feeds: Mapping[str, Tuple[str, ...]]):
+        self.version = version
+        self.topic_feeds = topic_feeds
+        # Every feed once (same feed may be listed under several topics)
+        self.all_feeds: Tuple[str, ...] = tuple(dict.fromkeys(
+            feed_url for feed_urls in topic_feeds.values() for feed_url in feed_urls
+        ))
+    
+    def feeds_for(self, topic: str) -> Tuple[str, ...]:
+        return self.topic_feeds.get(topic, ())
+
+
+def build_snapshot(version: int, custom_feeds: Iterable[Tuple[str, str]]) -> FeedRegistrySnapshot:
+    """Overlay (topic, feed_url) custom feeds on the defaults
+    
+    Only topics that have custom feeds get a new tuple; all other topics share
+    the default tuples.
+    """
+    overlay = {}
+    for topic, feed_url in custom_feeds:
+        if topic and feed_url:
+            overlay.setdefault(topic, list(DEFAULT_RSS_FEEDS.get(topic, ()))).append(feed_url)
+    
+    topic_feeds = dict(DEFAULT_RSS_FEEDS)
+    for topic, feed_urls in overlay.items():
+        topic_feeds[topic] = tuple(dict.fromkeys(feed_urls))
+    return FeedRegistrySnapshot(version, MappingProxyType(topic_feeds))
+
+
+class FeedRegistry:
+    """Versioned feed registry, rebuilt only after custom feeds change
+    
+    The routes that create, update or delete CustomRSSFeed rows call
+    invalidate(); the next snapshot() reloads the active custom feeds once.
+    Snapshots are immutable, so callers can keep using the one they got.
+    """
+    
+    def __init__(self):
+        self._snapshot: Optional[FeedRegistrySnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+    
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+    
+    def snapshot(self) -> FeedRegistrySnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self._version:
+                self._snapshot = build_snapshot(self._version, self._load_custom_feeds())
+                logger.info(f"Feed registry rebuilt (version {self._version}, {len(self._snapshot.all_feeds)} feeds)")
+            return self._snapshot
+    
+    def _load_custom_feeds(self) -> list:
+        """(topic, feed URL) of active custom feeds, one URL per shared feed"""
+        db = SessionLocal()
+        try:
+            rows = db.query(CustomRSSFeed.topic, Feed.url, CustomRSSFeed.feed_url).outerjoin(
+                Feed, CustomRSSFeed.feed_id == Feed.id
+            ).filter(
+                CustomRSSFeed.is_active == True
+            ).order_by(CustomRSSFeed.id).all()
+            return [(topic, url or normalize_feed_url(raw_url)) for topic, url, raw_url in rows]
+        finally:
+            db.close()
+
+
+def get_or_create_feed(db: Session, feed_url: str) -> Feed:
+    """Shared Feed row for a (normalized) feed URL
+    
+    If another request creates the same feed meanwhile, the session is rolled
+    back and the existing row returned, so call this before making other
+    changes in the session.
+    """
+    url = normalize_feed_url(feed_url)
+    feed = db.query(Feed).filter(Feed.url == url).first()
+    if feed is None:
+        feed = Feed(url=url)
+        db.add(feed)
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            feed = db.query(Feed).filter(Feed.url == url).one()
+    return feed
+
+
+# Singleton instance
+_registry_instance = FeedRegistry()
+
+
+def get_feed_registry() -> FeedRegistry:
+    """Get singleton feed registry"""
+    return _registry_instance
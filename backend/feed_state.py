@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from database import SessionLocal, settings
+from models import FeedState
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Outcome of one feed fetch (NewsFetcher.fetch_feed)
+FETCH_OK = "ok"
+FETCH_NOT_MODIFIED = "not_modified"
+FETCH_ERROR = "error"
+
+# Last parsed entries per feed (replayed on 304) and validators waiting for ingestion
+_last_entries: "OrderedDict[str, List[Dict]]" = OrderedDict()
+_pending_validators: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+
+def get_feed_validators(feed_url: str) -> Dict[str, Optional[str]]:
+    """Get stored ETag / Last-Modified for a feed (empty values if never fetched)"""
+    db = SessionLocal()
+    try:
+        state = db.query(FeedState).filter(FeedState.feed_url == feed_url).first()
+        if not state:
+            return {"etag": None, "last_modified": None}
+        return {"etag": state.etag, "last_modified": state.last_modified}
+    except Exception as e:
+        logger.error(f"Failed to load feed validators for {feed_url}: {str(e)}")
+        return {"etag": None, "last_modified": None}
+    finally:
+        db.close()
+
+
+def save_feed_validators(
+    feed_url: str,
+    status: int,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None
+):
+    """Record the result of a feed fetch
+
+    On 304 the stored validators are kept, otherwise they are replaced by the
+    ones from the latest response.
+    """
+    db = SessionLocal()
+    try:
+        state = db.query(FeedState).filter(FeedState.feed_url == feed_url).first()
+        if not state:
+            state = FeedState(feed_url=feed_url)
+            db.add(state)
+        
+        if status != 304:
+            state.etag = etag
+            state.last_modified = last_modified
+        state.last_status = status
+        state.last_fetched_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to save feed validators for {feed_url}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def remember_feed_entries(feed_url: str, articles: List[Dict]):
+    """Keep a feed's latest parsed entries, replayed when it answers 304 Not Modified"""
+    with _lock:
+        _last_entries[feed_url] = [dict(article) for article in articles]
+        _last_entries.move_to_end(feed_url)
+        while len(_last_entries) > settings.RSS_ENTRY_CACHE_FEEDS:
+            _last_entries.popitem(last=False)
+
+
+def replay_feed_entries(feed_url: str) -> Optional[List[Dict]]:
+    """Copy of the feed's last parsed entries (None if not in memory, e.g. after a restart)"""
+    with _lock:
+        articles = _last_entries.get(feed_url)
+        if articles is None:
+            return None
+        _last_entries.move_to_end(feed_url)
+        return [dict(article) for article in articles]
+
+
+def defer_feed_validators(feed_url: str, status: int, etag: Optional[str], last_modified: Optional[str]):
+    """Hold a response's validators until its entries are ingested (see commit_feed_validators)"""
+    with _lock:
+        _pending_validators[feed_url] = (status, etag, last_modified)
+
+
+def commit_feed_validators(feed_urls: Iterable[str]):
+    """Store the pending validators of feeds whose entries were merged and ingested
+    
+    Feeds fetched but not used (e.g. finished after the topic had enough
+    articles) keep their old validators, so their entries are not lost to 304s.
+    """
+    for feed_url in set(feed_urls):
+        with _lock:
+            pending = _pending_validators.pop(feed_url, None)
+        if pending is not None:
+            status, etag, last_modified = pending
+            save_feed_validators(feed_url, status, etag=etag, last_modified=last_modified)
@@ -0,0 +1,201 @@
+import itertools
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, Optional
+import feedparser
+from feedparser import FeedParserDict
+import logging
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+
+# Namespaces of the core RSS 2.0 / RSS 1.0 / Atom elements
+CORE_NS = {"", ATOM_NS, RSS1_NS}
+
+
+# Encodings expat decodes itself; XMLPullParser raises ValueError for multi-byte
+# ones like gbk / big5 / shift_jis, those feeds go to feedparser directly
+_EXPAT_ENCODINGS = {"utf-8", "utf8", "utf-16", "utf16", "us-ascii", "ascii", "iso-8859-1", "latin-1", "latin1"}
+_XML_DECLARATION_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+_CHARSET = re.compile(r"charset\s*=\s*[\"']?([A-Za-z0-9._-]+)", re.IGNORECASE)
+
+
+def _streamable_encoding(head: bytes, response_headers: Optional[Dict]) -> bool:
+    """Whether the body's declared encoding (XML declaration, else Content-Type charset) is one expat handles"""
+    if head.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")):
+        return True  # BOM: UTF-8 / UTF-16, handled by expat
+    match = _XML_DECLARATION_ENCODING.match(head)
+    if match:
+        encoding = match.group(1).decode("ascii")
+    else:
+        content_type = (response_headers or {}).get("content-type") or (response_headers or {}).get("Content-Type") or ""
+        charset = _CHARSET.search(content_type)
+        if not charset:
+            return True  # XML default: UTF-8
+        encoding = charset.group(1)
+    return encoding.lower() in _EXPAT_ENCODINGS
+
+
+def _split_tag(tag: str):
+    """'{ns}name' -> ('ns', 'name')"""
+    if tag.startswith("{"):
+        ns, _, name = tag[1:].partition("}")
+        return ns, name
+    return "", tag
+
+
+def _text(elem) -> str:
+    return "".join(elem.itertext()).strip()
+
+
+def _is_entry(ns: str, name: str) -> bool:
+    return (name == "item" and ns in ("", RSS1_NS)) or (name == "entry" and ns == ATOM_NS)
+
+
+def _entry_from_element(elem) -> FeedParserDict:
+    """Convert an RSS <item> / Atom <entry> element to a feedparser-like entry"""
+    entry = FeedParserDict()
+    content = None
+    media_content, media_thumbnail, enclosures = [], [], []
+    
+    for child in elem:
+        ns, name = _split_tag(child.tag)
+        
+        if ns in CORE_NS:
+            if name == "title":
+                entry["title"] = _text(child)
+            elif name == "link":
+                href = child.get("href")
+                if href is None:
+                    entry["link"] = _text(child)
+                elif child.get("rel", "alternate") == "alternate":
+                    entry.setdefault("link", href)
+                elif child.get("rel") == "enclosure":
+                    enclosures.append(FeedParserDict(href=href, url=href, type=child.get("type", "")))
+            elif name in ("guid", "id"):
+                entry["id"] = _text(child)
+            elif name in ("description", "summary"):
+                entry["summary"] = _text(child)
+            elif name == "content" and ns == ATOM_NS:
+                content = _text(child)
+            elif name in ("pubDate", "published", "issued"):
+                entry["published"] = _text(child)
+            elif name in ("updated", "modified"):
+                entry["updated"] = _text(child)
+            elif name == "enclosure":
+                enclosures.append(FeedParserDict(
+                    href=child.get("url"), url=child.get("url"), type=child.get("type", "")
+                ))
+        elif ns == CONTENT_NS and name == "encoded":
+            content = _text(child)
+        elif ns == DC_NS and name == "date":
+            entry.setdefault("published", _text(child))
+        elif ns == MEDIA_NS:
+            items = list(child) if name == "group" else [child]
+            for item in items:
+                _, item_name = _split_tag(item.tag)
+                if item_name == "content" and item.get("url"):
+                    media_content.append(FeedParserDict(item.attrib))
+                elif item_name == "thumbnail" and item.get("url"):
+                    media_thumbnail.append(FeedParserDict(item.attrib))
+    
+    if "summary" not in entry and content:
+        entry["summary"] = content
+    if media_content:
+        entry["media_content"] = media_content
+    if media_thumbnail:
+        entry["media_thumbnail"] = media_thumbnail
+    if enclosures:
+        entry["enclosures"] = enclosures
+    return entry
+
+
+def _build_result(feed_title: Optional[str], entries, links=None) -> FeedParserDict:
+    feed = FeedParserDict(title=feed_title) if feed_title else FeedParserDict()
+    if links:
+        feed["links"] = links
+    return FeedParserDict(feed=feed, entries=entries, bozo=0)
+
+
+def stream_parse_feed(
+    chunks: Iterable[bytes],
+    max_entries: int,
+    response_headers: Optional[Dict] = None
+) -> FeedParserDict:
+    """Parse an RSS / Atom body incrementally and stop once enough entries are read
+    
+    Only the part of the body up to the max_entries-th usable entry (one with a
+    title or summary) is read and parsed. Bodies the strict XML parser can't
+    handle (undeclared HTML entities, multi-byte encodings such as gbk / big5,
+    JSON feeds...) fall back to feedparser on the full body.
+    
+    Returns a feedparser-like result with "feed", "entries" and "bozo".
+    """
+    chunk_iter: Iterator[bytes] = iter(chunks)
+    
+    # Look at the XML declaration before streaming
+    head_chunks = []
+    head_size = 0
+    for chunk in chunk_iter:
+        head_chunks.append(chunk)
+        head_size += len(chunk)
+        if head_size >= 512:
+            break
+    if not _streamable_encoding(b"".join(head_chunks)[:512], response_headers):
+        body = b"".join(head_chunks) + b"".join(chunk_iter)
+        return feedparser.parse(body, response_headers=response_headers)
+    chunk_iter = itertools.chain(head_chunks, chunk_iter)
+    
+    parser = ET.XMLPullParser(events=("start", "end"))
+    received = []  # Bytes read so far, kept for the feedparser fallback
+    stack = []
+    feed_title = None
+    feed_links = []  # Feed-level <atom:link rel="..."> (WebSub hub / self)
+    entries = []
+    usable = 0
+    
+    try:
+        for chunk in chunk_iter:
+            if not chunk:
+                continue
+            received.append(chunk)
+            parser.feed(chunk)
+            
+            for event, elem in parser.read_events():
+                ns, name = _split_tag(elem.tag)
+                if event == "start":
+                    stack.append(name)
+                    continue
+                
+                stack.pop()
+                if _is_entry(ns, name):
+                    entry = _entry_from_element(elem)
+                    elem.clear()  # Keep memory bounded on large feeds
+                    entries.append(entry)
+                    if entry.get("title") or entry.get("summary"):
+                        usable += 1
+                elif name == "title" and ns in CORE_NS and stack and stack[-1] in ("channel", "feed"):
+                    feed_title = _text(elem)
+                elif name == "link" and ns == ATOM_NS and stack and stack[-1] in ("channel", "feed") and elem.get("rel"):
+                    feed_links.append(FeedParserDict(rel=elem.get("rel"), href=elem.get("href", "")))
+                
+                if usable >= max_entries:
+                    return _build_result(feed_title, entries, feed_links)
+        
+        parser.close()
+    except (ET.ParseError, ValueError, LookupError) as e:
+        # ValueError / LookupError: encodings expat can't decode
+        logger.debug(f"Streaming feed parse failed, falling back to feedparser: {str(e)}")
+        entries = []
+    
+    if entries:
+        return _build_result(feed_title, entries, feed_links)
+    
+    # Not parseable as plain XML (or no entries found): let feedparser handle the full body
+    body = b"".join(received) + b"".join(chunk_iter)
+    return feedparser.parse(body, response_headers=response_headers)
@@ -0,0 +1,99 @@
+import threading
+import time
+import requests
+from typing import Iterator
+from requests.adapters import HTTPAdapter
+from database import settings
+from http_fixtures import FixtureAdapter, get_fixture_mode, MODE_OFF
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Process-wide pooled HTTP session (keep-alive connections are reused across calls)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared pooled HTTP session
+    
+    One connection pool per host, at most HTTP_POOL_MAXSIZE connections each.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                pool_options = dict(
+                    pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                    pool_block=True  # Wait for a free connection instead of opening extra ones
+                )
+                fixture_mode = get_fixture_mode()
+                if fixture_mode != MODE_OFF:
+                    # Record / replay responses for offline benchmarking
+                    adapter = FixtureAdapter(fixture_mode, **pool_options)
+                    logger.warning(f"HTTP fixture mode: {fixture_mode} ({settings.HTTP_FIXTURE_DIR})")
+                else:
+                    adapter = HTTPAdapter(**pool_options)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+                logger.info(
+                    f"HTTP session initialized (hosts: {settings.HTTP_POOL_CONNECTIONS}, "
+                    f"connections per host: {settings.HTTP_POOL_MAXSIZE})"
+                )
+    return _session
+
+
+class DownloadLimitError(Exception):
+    """Response body exceeded its size or time budget"""
+    pass
+
+
+def iter_limited(
+    response: requests.Response,
+    max_bytes: int,
+    deadline_seconds: float,
+    chunk_size: int = 16 * 1024
+) -> Iterator[bytes]:
+    """Stream a response body (stream=True) within a size and total time budget
+    
+    gzip / deflate / brotli bodies are decompressed incrementally by urllib3, and
+    max_bytes applies to the decompressed size, so a compressed bomb is cut off
+    as early as an oversized plain body. Raises DownloadLimitError when a budget
+    is exceeded; the caller should close the response.
+    """
+    declared = response.headers.get("Content-Length")
+    encoded = response.headers.get("Content-Encoding", "identity").lower() not in ("", "identity")
+    if declared and declared.isdigit() and not encoded and int(declared) > max_bytes:
+        raise DownloadLimitError(f"Content-Length {declared} exceeds {max_bytes} bytes: {response.url}")
+    
+    deadline = time.monotonic() + deadline_seconds
+    received = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        received += len(chunk)
+        if received > max_bytes:
+            raise DownloadLimitError(f"Body exceeds {max_bytes} bytes: {response.url}")
+        if time.monotonic() > deadline:
+            raise DownloadLimitError(f"Download took longer than {deadline_seconds}s: {response.url}")
+        yield chunk
+
+
+def read_limited(response: requests.Response, max_bytes: int, deadline_seconds: float) -> bytes:
+    """Read a whole response body (stream=True) within a size and total time budget"""
+    return b"".join(iter_limited(response, max_bytes, deadline_seconds, chunk_size=64 * 1024))
+
+
+def http_timeout(read_timeout: float) -> tuple:
+    """Build a (connect, read) timeout tuple using the configured connect timeout"""
+    return (settings.HTTP_CONNECT_TIMEOUT, read_timeout)
+
+
+def close_http_session():
+    """Close the shared session and release pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,267 @@
+# Record / replay of outbound HTTP traffic for offline benchmarking.
+# HTTP_FIXTURE_MODE=record saves every response of NewsFetcher and NewsSummarizer
+# (feeds, GNews, NewsData, Ollama, NVIDIA, DashScope) under HTTP_FIXTURE_DIR,
+# HTTP_FIXTURE_MODE=replay serves them back without touching the network.
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from database import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# Query parameters never written to cassettes (and ignored in cassette keys)
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token"}
+
+# Body is stored decoded, so these no longer describe it
+DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+class FixtureMissingError(requests.exceptions.ConnectionError):
+    """No recorded response exists for a request in replay mode"""
+
+
+def get_fixture_mode() -> str:
+    mode = (settings.HTTP_FIXTURE_MODE or MODE_OFF).lower()
+    return mode if mode in (MODE_RECORD, MODE_REPLAY) else MODE_OFF
+
+
+def redact_url(url: str) -> str:
+    """Replace secret query parameters (API keys) with a placeholder"""
+    parts = urlsplit(url)
+    query = [
+        (name, "REDACTED" if name.lower() in SECRET_PARAMS else value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+class CassetteStore:
+    """One JSON file per recorded exchange: <dir>/<host>/<key>.json"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+    
+    def make_key(self, method: str, url: str, body: Optional[bytes]) -> str:
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode("utf-8"))
+        digest.update(redact_url(url).encode("utf-8"))
+        digest.update(body or b"")
+        return digest.hexdigest()[:32]
+    
+    def _path(self, host: str, key: str) -> str:
+        safe_host = "".join(c if c.isalnum() or c in ".-" else "_" for c in host or "local")
+        return os.path.join(self.directory, safe_host, f"{key}.json")
+    
+    def load(self, host: str, key: str) -> Optional[Dict]:
+        path = self._path(host, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def save(self, host: str, key: str, record: Dict):
+        path = self._path(host, key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+
+
+_store = None
+
+
+def get_cassette_store() -> CassetteStore:
+    global _store
+    if _store is None:
+        _store = CassetteStore(settings.HTTP_FIXTURE_DIR)
+    return _store
+
+
+def simulate_latency(recorded_seconds: float):
+    """Sleep like the real request would have in replay mode"""
+    if settings.HTTP_FIXTURE_LATENCY_MS < 0:
+        delay = recorded_seconds
+    else:
+        delay = settings.HTTP_FIXTURE_LATENCY_MS / 1000
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _encode_body(body) -> Optional[bytes]:
+    if body is None:
+        return None
+    return body.encode("utf-8") if isinstance(body, str) else bytes(body)
+
+
+class FixtureAdapter(HTTPAdapter):
+    """requests transport adapter that records or replays responses"""
+    
+    def __init__(self, mode: str, **kwargs):
+        self.mode = mode
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        store = get_cassette_store()
+        host = urlsplit(request.url).hostname
+        key = store.make_key(request.method, request.url, _encode_body(request.body))
+        
+        if self.mode == MODE_REPLAY:
+            record = store.load(host, key)
+            if record is None:
+                raise FixtureMissingError(f"No recorded response for {request.method} {redact_url(request.url)}")
+            simulate_latency(record.get("elapsed", 0))
+            return self._build_response(request, record)
+        
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        content = response.content  # Reads (and decodes) the whole body
+        store.save(host, key, {
+            "request": {"method": request.method, "url": redact_url(request.url)},
+            "status": response.status_code,
+            "reason": response.reason,
+            "url": redact_url(response.url),
+            "headers": {
+                k: v for k, v in response.headers.items()
+                if k.lower() not in DROPPED_RESPONSE_HEADERS
+            },
+            "body": base64.b64encode(content).decode("ascii"),
+            "elapsed": round(time.monotonic() - started, 3),
+        })
+        return response
+    
+    def _build_response(self, request, record: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record.get("reason")
+        response.headers = CaseInsensitiveDict(record.get("headers", {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response._content = base64.b64decode(record["body"])
+        response._content_consumed = True
+        return response
+
+
+def fixture_call(kind: str, payload: Dict, call: Callable, serialize: Callable, deserialize: Callable):
+    """Record or replay an SDK call that doesn't go through our HTTP session
+    
+    Args:
+        kind: Cassette namespace (e.g. "dashscope")
+        payload: JSON-serializable call arguments, used as cassette key
+        call: Performs the real call
+        serialize: Converts the call result to a JSON-serializable dict
+        deserialize: Rebuilds a result object from that dict
+    """
+    mode = get_fixture_mode()
+    if mode == MODE_OFF:
+        return call()
+    
+    store = get_cassette_store()
+    key = store.make_key("CALL", kind, json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    
+    if mode == MODE_REPLAY:
+        record = store.load(kind, key)
+        if record is None:
+            raise FixtureMissingError(f"No recorded {kind} response")
+        simulate_latency(record.get("elapsed", 0))
+        return deserialize(record["result"])
+    
+    started = time.monotonic()
+    result = call()
+    store.save(kind, key, {
+        "request": payload,
+        "result": serialize(result),
+        "elapsed": round(time.monotonic() - started, 3),
+    })
+    return result
+
+
+def serialize_dashscope_response(response) -> Dict:
+    output = getattr(response, "output", None)
+    return {
+        "status_code": response.status_code,
+        "message": getattr(response, "message", ""),
+        "text": getattr(output, "text", None) if output else None,
+    }
+
+
+def deserialize_dashscope_response(data: Dict):
+    return SimpleNamespace(
+        status_code=data["status_code"],
+        message=data.get("message", ""),
+        output=SimpleNamespace(text=data.get("text") or "")
+    )
+
+
+def get_fixture_httpx_client():
+    """httpx client for the OpenAI SDK (NVIDIA) that records / replays, None when off"""
+    mode = get_fixture_mode()
+    if mode == MODE_OFF:
+        return None
+    
+    import httpx
+    
+    class FixtureTransport(httpx.BaseTransport):
+        def __init__(self):
+            self._inner = httpx.HTTPTransport()
+        
+        def handle_request(self, request):
+            store = get_cassette_store()
+            url = str(request.url)
+            host = request.url.host
+            key = store.make_key(request.method, url, request.read())
+            
+            if mode == MODE_REPLAY:
+                record = store.load(host, key)
+                if record is None:
+                    raise httpx.ConnectError(f"No recorded response for {request.method} {redact_url(url)}", request=request)
+                simulate_latency(record.get("elapsed", 0))
+                return httpx.Response(
+                    record["status"],
+                    headers=record.get("headers", {}),
+                    content=base64.b64decode(record["body"]),
+                    request=request
+                )
+            
+            started = time.monotonic()
+            response = self._inner.handle_request(request)
+            content = response.read()
+            store.save(host, key, {
+                "request": {"method": request.method, "url": redact_url(url)},
+                "status": response.status_code,
+                "headers": {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() not in DROPPED_RESPONSE_HEADERS
+                },
+                "body": base64.b64encode(content).decode("ascii"),
+                "elapsed": round(time.monotonic() - started, 3),
+            })
+            return httpx.Response(
+                response.status_code,
+                headers=[(k, v) for k, v in response.headers.items() if k.lower() not in DROPPED_RESPONSE_HEADERS],
+                content=content,
+                request=request
+            )
+        
+        def close(self):
+            self._inner.close()
+    
+    return httpx.Client(transport=FixtureTransport())
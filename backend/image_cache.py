@@ -0,0 +1,262 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from database import settings
+from http_client import get_http_session, http_timeout, read_limited, DownloadLimitError
+from url_utils import canonicalize_url
+from news_fetcher import FEED_USER_AGENT
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Path the frontend loads cached thumbnails from (see routes/news.py)
+IMAGE_PROXY_PATH = "/api/news/image/"
+
+# Only raster formats are proxied: an SVG served from our origin could run script
+ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/avif"}
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+_IMAGE_META_KEYS = (
+    ("property", "og:image"),
+    ("property", "og:image:url"),
+    ("property", "og:image:secure_url"),
+    ("name", "twitter:image"),
+    ("name", "twitter:image:src"),
+)
+
+
+def sniff_image_type(body: bytes) -> Optional[str]:
+    """Content type of an allowed raster image from its magic bytes (None for anything else)"""
+    if body.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if body.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if body.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if body[:4] == b"RIFF" and body[8:12] == b"WEBP":
+        return "image/webp"
+    if body[4:8] == b"ftyp" and body[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    return None
+
+
+def image_cache_key(canonical_url: str) -> str:
+    """Cache key of an article's thumbnail (hash of its canonical URL)"""
+    return hashlib.sha256(canonical_url.encode("utf-8")).hexdigest()[:32]
+
+
+def is_valid_image_key(key: str) -> bool:
+    return bool(_KEY_PATTERN.match(key))
+
+
+class _HeadDone(Exception):
+    pass
+
+
+class OgImageParser(HTMLParser):
+    """Collects og:image / twitter:image / image_src from a page's <head>"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.candidates: Dict[tuple, str] = {}
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = {name.lower(): (value or "") for name, value in attrs}
+        if tag == "meta":
+            for attr, name in _IMAGE_META_KEYS:
+                if attrs.get(attr, "").lower() == name and attrs.get("content"):
+                    self.candidates.setdefault((attr, name), attrs["content"].strip())
+        elif tag == "link" and attrs.get("rel", "").lower() == "image_src" and attrs.get("href"):
+            self.candidates.setdefault(("link", "image_src"), attrs["href"].strip())
+        elif tag == "body":
+            raise _HeadDone()
+    
+    def handle_endtag(self, tag):
+        if tag == "head":
+            raise _HeadDone()
+    
+    def best(self) -> Optional[str]:
+        for key in list(_IMAGE_META_KEYS) + [("link", "image_src")]:
+            if key in self.candidates:
+                return self.candidates[key]
+        return None
+
+
+def find_og_image(page_url: str) -> Optional[str]:
+    """Read an article page's <head> (at most IMAGE_PAGE_MAX_BYTES) and return its og:image URL"""
+    response = get_http_session().get(
+        page_url,
+        headers={"User-Agent": FEED_USER_AGENT, "Accept": "text/html"},
+        timeout=http_timeout(settings.IMAGE_FETCH_TIMEOUT),
+        stream=True
+    )
+    try:
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return None
+        
+        parser = OgImageParser()
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if received >= settings.IMAGE_PAGE_MAX_BYTES:
+                    break
+        except _HeadDone:
+            pass
+        
+        image_url = parser.best()
+        return urljoin(response.url, image_url) if image_url else None
+    finally:
+        response.close()
+
+
+def download_image(image_url: str) -> Optional[tuple]:
+    """Download an image, returns (bytes, content_type) or None if it is not a raster image or too large"""
+    response = get_http_session().get(
+        image_url,
+        headers={"User-Agent": FEED_USER_AGENT},
+        timeout=http_timeout(settings.IMAGE_FETCH_TIMEOUT),
+        stream=True
+    )
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in ALLOWED_IMAGE_TYPES:
+            return None
+        try:
+            body = read_limited(response, settings.IMAGE_MAX_BYTES, settings.IMAGE_FETCH_TIMEOUT)
+        except DownloadLimitError as e:
+            logger.debug(f"Image skipped: {str(e)}")
+            return None
+        # The stored type comes from the bytes, not from the server's header
+        sniffed_type = sniff_image_type(body)
+        if sniffed_type is None:
+            logger.debug(f"Image skipped, not a raster image: {image_url}")
+            return None
+        return body, sniffed_type
+    finally:
+        response.close()
+
+
+class ImageCache:
+    """Thumbnails on disk: <dir>/<key[:2]>/<key> plus a <key>.json sidecar
+    
+    Articles without a usable image get a sidecar with no content type, so
+    their pages are not downloaded again.
+    """
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+    
+    def get_meta(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key) + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """Returns (file path, content type) of a cached image"""
+        meta = self.get_meta(key)
+        # Entries cached before the raster-only rule are not served
+        if not meta or meta.get("content_type") not in ALLOWED_IMAGE_TYPES:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        return path, meta["content_type"]
+    
+    def put(self, key: str, source_url: Optional[str], body: Optional[bytes], content_type: Optional[str]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if body is not None:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        meta_tmp = f"{path}.{threading.get_ident()}.json.tmp"
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump({"source_url": source_url, "content_type": content_type}, f)
+        os.replace(meta_tmp, path + ".json")
+
+
+_cache_instance = None
+
+
+def get_image_cache() -> ImageCache:
+    """Get singleton image cache"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = ImageCache(settings.IMAGE_CACHE_DIR)
+    return _cache_instance
+
+
+def _enrich_one(article: Dict, key: str):
+    """Find, download and cache one article's thumbnail"""
+    cache = get_image_cache()
+    candidates = []
+    if article.get("image_url"):
+        candidates.append(article["image_url"])
+    
+    try:
+        if not candidates:
+            og_image = find_og_image(article["url"])
+            if og_image:
+                candidates.append(og_image)
+        
+        for image_url in candidates:
+            image = download_image(image_url)
+            if image:
+                cache.put(key, image_url, image[0], image[1])
+                article["image_url"] = IMAGE_PROXY_PATH + key
+                return
+        cache.put(key, candidates[0] if candidates else None, None, None)
+    except Exception as e:
+        # Keep the original image URL, try again next time
+        logger.debug(f"Image enrichment failed for {article.get('url')}: {str(e)}")
+
+
+def enrich_article_images(articles: List[Dict]) -> int:
+    """Point articles' image_url at locally cached thumbnails
+    
+    Missing images are taken from the article page's og:image. Pages and
+    images are downloaded concurrently (IMAGE_ENRICH_CONCURRENCY) with byte
+    caps; results are cached on disk by canonical URL. Returns the number of
+    articles served from the local image proxy.
+    """
+    if not settings.IMAGE_PROXY_ENABLED:
+        return 0
+    
+    cache = get_image_cache()
+    pending = []
+    for article in articles:
+        if not article.get("url"):
+            continue
+        key = image_cache_key(article.get("canonical_url") or canonicalize_url(article["url"]))
+        meta = cache.get_meta(key)
+        if meta is not None:
+            if meta.get("content_type") and cache.get(key):
+                article["image_url"] = IMAGE_PROXY_PATH + key
+            continue
+        pending.append((article, key))
+    
+    if pending:
+        workers = max(1, min(settings.IMAGE_ENRICH_CONCURRENCY, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-enrich") as executor:
+            for article, key in pending:
+                executor.submit(_enrich_one, article, key)
+    
+    return sum(1 for article in articles if (article.get("image_url") or "").startswith(IMAGE_PROXY_PATH))
@@ -0,0 +1,143 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal, settings
+from models import LLMCacheEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hits refresh last_used_at at most this often (avoids a write per hit)
+TOUCH_INTERVAL = timedelta(hours=1)
+# Check the cache size after this many stored outputs
+EVICT_CHECK_EVERY = 200
+
+_WHITESPACE = re.compile(r"\s+")
+_writes_since_check = 0
+_writes_lock = threading.Lock()
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Unicode-normalized, whitespace-collapsed text (formatting differences don't change the key)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def llm_cache_key(
+    model: str,
+    mode: str,
+    prompt_version: int,
+    title: str,
+    content: str,
+    topic: Optional[str] = None
+) -> str:
+    """Content address of one LLM output: hash(model, mode, prompt version, [topic], title + content)"""
+    parts = [model, mode, str(prompt_version), normalize_text(topic), normalize_text(title), normalize_text(content)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_cached_outputs(keys: Iterable[str]) -> Dict[str, str]:
+    """Cached outputs for the given keys (missing keys are left out)"""
+    keys = list(dict.fromkeys(keys))
+    if not settings.LLM_CACHE_ENABLED or not keys:
+        return {}
+    
+    db = SessionLocal()
+    try:
+        entries = db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key.in_(keys)).all()
+        now = datetime.utcnow()
+        touched = False
+        for entry in entries:
+            if entry.last_used_at is None or entry.last_used_at < now - TOUCH_INTERVAL:
+                entry.last_used_at = now
+                touched = True
+        if touched:
+            db.commit()
+        return {entry.cache_key: entry.output for entry in entries}
+    except Exception as e:
+        logger.error(f"Failed to read LLM cache: {str(e)}")
+        db.rollback()
+        return {}
+    finally:
+        db.close()
+
+
+def store_outputs(entries: List[tuple]):
+    """Store (key, mode, output) tuples; keys already cached are kept as they are"""
+    global _writes_since_check
+    if not settings.LLM_CACHE_ENABLED or not entries:
+        return
+    
+    entries = list({key: (key, mode, output) for key, mode, output in entries}.values())
+    db = SessionLocal()
+    try:
+        existing = {
+            key for (key,) in db.query(LLMCacheEntry.cache_key).filter(
+                LLMCacheEntry.cache_key.in_([key for key, _, _ in entries])
+            ).all()
+        }
+        new_entries = [entry for entry in entries if entry[0] not in existing]
+        for key, mode, output in new_entries:
+            db.add(LLMCacheEntry(cache_key=key, mode=mode, output=output, size=len(output.encode("utf-8"))))
+        db.commit()
+    except IntegrityError:
+        # Another worker stored the same output meanwhile
+        db.rollback()
+        return
+    except Exception as e:
+        logger.error(f"Failed to write LLM cache: {str(e)}")
+        db.rollback()
+        return
+    finally:
+        db.close()
+    
+    with _writes_lock:
+        _writes_since_check += len(new_entries)
+        check = _writes_since_check >= EVICT_CHECK_EVERY
+        if check:
+            _writes_since_check = 0
+    if check:
+        evict_llm_cache()
+
+
+def evict_llm_cache() -> int:
+    """Drop least recently used outputs until the cache is within LLM_CACHE_MAX_BYTES
+    
+    Evicts down to 90% of the limit so the next writes don't trigger another
+    eviction right away. Returns the number of entries removed.
+    """
+    db = SessionLocal()
+    try:
+        total = db.query(func.coalesce(func.sum(LLMCacheEntry.size), 0)).scalar() or 0
+        if total <= settings.LLM_CACHE_MAX_BYTES:
+            return 0
+        
+        to_free = total - int(settings.LLM_CACHE_MAX_BYTES * 0.9)
+        freed = 0
+        doomed = []
+        rows = db.query(LLMCacheEntry.id, LLMCacheEntry.size).order_by(
+            LLMCacheEntry.last_used_at.asc(), LLMCacheEntry.id.asc()
+        ).all()
+        for entry_id, size in rows:
+            if freed >= to_free:
+                break
+            doomed.append(entry_id)
+            freed += size or 0
+        
+        for start in range(0, len(doomed), 500):
+            db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.id.in_(doomed[start:start + 500])
+            ).delete(synchronize_session=False)
+        db.commit()
+        logger.info(f"LLM cache evicted {len(doomed)} entries ({freed} bytes), was {total} bytes")
+        return len(doomed)
+    except Exception as e:
+        logger.error(f"LLM cache eviction failed: {str(e)}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, TypeVar
+from database import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def provider_concurrency(provider: str) -> int:
+    """Max in-flight requests for a provider (a local Ollama gets its own, usually lower, limit)"""
+    if provider == "ollama":
+        return max(1, settings.OLLAMA_MAX_CONCURRENCY)
+    return max(1, settings.LLM_MAX_CONCURRENCY)
+
+
+class LLMExecutor:
+    """Runs LLM work with a bounded number of in-flight requests per provider
+    
+    Every provider request goes through slot(provider), a semaphore shared by
+    all callers (topics ingested in parallel included), so the provider never
+    sees more than its limit. map() fans work out over a short-lived thread
+    pool and returns results in input order. Slots are only held for the
+    duration of one request, so work running inside map() may itself use the
+    executor without deadlocking.
+    """
+    
+    def __init__(self):
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(provider)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(provider_concurrency(provider))
+                self._semaphores[provider] = semaphore
+            return semaphore
+    
+    @contextmanager
+    def slot(self, provider: str):
+        """Hold one of the provider's request slots"""
+        semaphore = self._semaphore(provider)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+    
+    def map(self, provider: str, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """func(item) for every item, up to the provider's limit at a time, results in input order
+        
+        Exceptions raised by func propagate to the caller, like the builtin map.
+        """
+        items = list(items)
+        workers = min(provider_concurrency(provider), len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"llm-{provider}") as executor:
+            return list(executor.map(func, items))
+
+
+# Singleton instance
+_executor_instance = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> LLMExecutor:
+    """Get singleton LLM executor"""
+    global _executor_instance
+    if _executor_instance is None:
+        with _executor_lock:
+            if _executor_instance is None:
+                _executor_instance = LLMExecutor()
+    return _executor_instance
@@ -5,7 +5,11 @@ from database import engine, Base, settings
 from routes import auth_router, subscriptions_router, news_router
 from routes.schedule import router as schedule_router
 from routes.preferences import router as preferences_router
+from routes.admin import router as admin_router
 from scheduler import start_scheduler, stop_scheduler
+from http_client import close_http_session
+from news_fetcher import shutdown_parse_pool
+from migrations import run_migrations
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +24,7 @@ async def lifespan(app: FastAPI):
     
     # Create database tables
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     logger.info("Database tables created")
     
     # Start scheduler
@@ -30,6 +35,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down...")
     stop_scheduler()
+    close_http_session()
+    shutdown_parse_pool()
 
 
 # Create FastAPI app
@@ -56,6 +63,7 @@ app.include_router(subscriptions_router)
 app.include_router(news_router)
 app.include_router(schedule_router)
 app.include_router(preferences_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -0,0 +1,113 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from database import Base
+from models import CustomRSSFeed
+from feed_registry import get_or_create_feed
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(engine: Engine):
+    """Add columns that exist on the models but not yet in the database
+    
+    Base.metadata.create_all() only creates missing tables, so columns added to
+    existing models would otherwise be missing on databases created by an older
+    version. New columns must be nullable (or have a server default).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            existing_indexes = {idx["name"] for idx in inspector.get_indexes(table.name)}
+            
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+            
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=conn, checkfirst=True)
+                    logger.info(f"Created index {index.name}")
+
+
+def scope_entry_ids_to_topic(engine: Engine):
+    """Drop the old global unique index on news_cache.entry_id
+    
+    Entries of a feed shared by several topics are stored once per topic now
+    (unique on topic + entry_id). add_missing_columns() then recreates
+    ix_news_cache_entry_id as a plain index and adds the new unique index.
+    """
+    inspector = inspect(engine)
+    if "news_cache" not in inspector.get_table_names():
+        return
+    
+    for index in inspector.get_indexes("news_cache"):
+        if index["name"] == "ix_news_cache_entry_id" and index.get("unique"):
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_news_cache_entry_id"))
+            logger.info("Dropped global unique index on news_cache.entry_id")
+
+
+def link_custom_feeds(engine: Engine):
+    """Point custom RSS feeds without a feed_id at shared Feed rows and collapse duplicates
+    
+    Only unlinked rows are looked at, so once every row is linked this is a
+    single query. A user's feeds with the same topic and normalized URL are
+    merged into the row already linked (or the oldest one), active if any of
+    them was active.
+    """
+    db = Session(bind=engine)
+    try:
+        unlinked = db.query(CustomRSSFeed).filter(
+            CustomRSSFeed.feed_id.is_(None)
+        ).order_by(CustomRSSFeed.id).all()
+        if not unlinked:
+            return
+        
+        linked = 0
+        removed = 0
+        for custom_feed in unlinked:
+            feed_id = get_or_create_feed(db, custom_feed.feed_url).id
+            keeper = db.query(CustomRSSFeed).filter(
+                CustomRSSFeed.user_id == custom_feed.user_id,
+                CustomRSSFeed.topic == custom_feed.topic,
+                CustomRSSFeed.feed_id == feed_id,
+                CustomRSSFeed.id != custom_feed.id
+            ).order_by(CustomRSSFeed.id).first()
+            
+            if keeper is not None:
+                keeper.is_active = bool(keeper.is_active or custom_feed.is_active)
+                db.delete(custom_feed)
+                removed += 1
+                continue
+            custom_feed.feed_id = feed_id
+            linked += 1
+        
+        db.commit()
+        logger.info(f"Linked {linked} custom RSS feeds to shared feeds, removed {removed} duplicates")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_migrations(engine: Engine):
+    """Run lightweight schema migrations at startup"""
+    try:
+        scope_entry_ids_to_topic(engine)
+        add_missing_columns(engine)
+        link_custom_feeds(engine)
+    except Exception as e:
+        logger.error(f"Database migration failed: {str(e)}")
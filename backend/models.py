@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, UniqueConstraint, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, UniqueConstraint, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -41,20 +41,85 @@ class Subscription(Base):
     user = relationship("User", back_populates="subscriptions")
 
 
+class Feed(Base):
+    """RSS源表 - 每个（规范化后的）RSS源URL只有一行，由所有用户的自定义RSS源共享"""
+    __tablename__ = "feeds"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True, nullable=False)  # 规范化后的URL（实际抓取的地址）
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class CustomRSSFeed(Base):
-    """自定义RSS源表"""
+    """自定义RSS源表（用户对RSS源的订阅）"""
     __tablename__ = "custom_rss_feeds"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     topic = Column(String, nullable=False)  # 主题名称
-    feed_url = Column(String, nullable=False)  # RSS源URL
+    feed_url = Column(String, nullable=False)  # RSS源URL（用户填写的原始地址）
+    feed_id = Column(Integer, ForeignKey("feeds.id"), nullable=True, index=True)  # 共享的RSS源
     is_active = Column(Boolean, default=True)  # 是否启用（是否订阅）
     roast_mode = Column(Boolean, default=False)  # 是否使用吐槽模式
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     user = relationship("User")
+    feed = relationship("Feed")
+
+
+class FeedState(Base):
+    """RSS源抓取状态表 - 保存条件请求所需的 ETag / Last-Modified"""
+    __tablename__ = "feed_states"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    feed_url = Column(String, unique=True, index=True, nullable=False)
+    etag = Column(String, nullable=True)  # 上次响应的 ETag
+    last_modified = Column(String, nullable=True)  # 上次响应的 Last-Modified
+    last_status = Column(Integer, nullable=True)  # 上次抓取的HTTP状态码
+    last_fetched_at = Column(DateTime, nullable=True)
+    
+    # 自适应轮询：根据条目发布时间估计更新频率
+    poll_interval_minutes = Column(Integer, nullable=True)  # 当前轮询间隔（分钟）
+    next_poll_at = Column(DateTime, nullable=True, index=True)  # 下次轮询时间（UTC）
+    last_entry_at = Column(DateTime, nullable=True)  # 最新条目的发布时间（UTC）
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WebSubSubscription(Base):
+    """WebSub（PubSubHubbub）订阅表 - RSS源通过hub推送新条目"""
+    __tablename__ = "websub_subscriptions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    feed_url = Column(String, unique=True, index=True, nullable=False)  # 我们抓取的RSS源URL
+    topic_url = Column(String, nullable=False)  # hub 中的 topic（RSS源的 rel="self" 地址）
+    hub_url = Column(String, nullable=False)  # hub 地址
+    callback_token = Column(String, unique=True, index=True, nullable=False)  # 回调地址中的随机标识
+    secret = Column(String, nullable=False)  # 推送内容 HMAC 签名密钥
+    state = Column(String, default="discovered")  # "discovered", "pending", "verified", "unsubscribed", "denied", "failed"
+    lease_seconds = Column(Integer, nullable=True)  # hub 确认的租期
+    expires_at = Column(DateTime, nullable=True, index=True)  # 租期到期时间（UTC）
+    last_error = Column(Text, nullable=True)
+    last_push_at = Column(DateTime, nullable=True)  # 最近一次收到推送的时间
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NewsApiQuotaUsage(Base):
+    """新闻API每日配额使用表 - 重启后继续累计当天已用的请求数"""
+    __tablename__ = "news_api_quota_usage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    provider = Column(String, nullable=False)  # "gnews" 或 "newsdata"
+    day = Column(String, nullable=False)  # UTC 日期 YYYY-MM-DD（两家API均在UTC零点重置）
+    used = Column(Integer, nullable=False, default=0)  # 当天已发送的请求数
+    exhausted = Column(Boolean, default=False)  # API 返回过 429，当天不再请求
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('provider', 'day', name='uq_news_api_quota_provider_day'),
+    )
 
 
 class NewsCache(Base):
@@ -66,6 +131,7 @@ class NewsCache(Base):
     summary = Column(Text, nullable=False)  # LLM generated summary
     summary_roast = Column(Text, nullable=True)  # 吐槽模式摘要
     url = Column(String, nullable=False)
+    canonical_url = Column(String, index=True, nullable=True)  # 规范化URL（去除跟踪参数/AMP/移动域名），用于跨来源去重
     source = Column(String, nullable=True)  # News source name
     image_url = Column(String, nullable=True)
     published_at = Column(DateTime, nullable=True)
@@ -73,11 +139,32 @@ class NewsCache(Base):
     date = Column(String, index=True)  # YYYY-MM-DD for daily grouping
     relevance_score = Column(Float, nullable=True, default=0.5)  # 相关性分数 (0-1)，由LLM评估
     
-    # Unique identifier for RSS entries (feed_url + guid/link hash)
-    entry_id = Column(String, index=True, unique=True, nullable=True)  # 用于RSS源的唯一标识
+    # Identifier for RSS entries (feed_url + guid/link hash), unique per topic
+    entry_id = Column(String, index=True, nullable=True)  # 用于RSS源的唯一标识（同一RSS源可属于多个主题）
+    
+    # SimHash of title + content (hex), used for near-duplicate detection
+    simhash = Column(String, nullable=True)
     
     # Metadata
     raw_content = Column(Text, nullable=True)  # Original news content snippet
+    
+    # 唯一约束：每个主题下同一RSS条目只保存一次
+    __table_args__ = (
+        Index('uq_news_cache_topic_entry', 'topic', 'entry_id', unique=True),
+    )
+
+
+class LLMCacheEntry(Base):
+    """LLM输出缓存表 - 按内容寻址（模型 + 模式 + 提示词版本 + 标题和内容的哈希）"""
+    __tablename__ = "llm_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)  # sha256(模型, 模式, 提示词版本, [主题], 标题+内容)
+    mode = Column(String, nullable=False)  # "summary", "roast", "relevance"
+    output = Column(Text, nullable=False)  # LLM输出（相关性分数以字符串保存）
+    size = Column(Integer, nullable=False, default=0)  # 输出字节数，用于按容量淘汰
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)  # 最近命中时间（LRU淘汰）
 
 
 class SystemLog(Base):
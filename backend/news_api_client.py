@@ -0,0 +1,362 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from database import SessionLocal, settings
+from models import NewsApiQuotaUsage
+from http_client import get_http_session, http_timeout, read_limited
+from date_parsing import parse_datetime
+from dedup import extract_features
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_GNEWS = "gnews"
+PROVIDER_NEWSDATA = "newsdata"
+
+# Share of a topic's terms (words / CJK bigrams) a batched result must contain to belong to it
+TOPIC_MATCH_MIN_COVERAGE = 0.5
+
+
+class QuotaExceededError(Exception):
+    """The provider's daily request budget is used up"""
+    pass
+
+
+def load_quota_usage(provider: str, day: str) -> tuple:
+    """(used, exhausted) stored for a provider and UTC day"""
+    db = SessionLocal()
+    try:
+        usage = db.query(NewsApiQuotaUsage).filter(
+            NewsApiQuotaUsage.provider == provider,
+            NewsApiQuotaUsage.day == day
+        ).first()
+        if usage is None:
+            return 0, False
+        return usage.used or 0, bool(usage.exhausted)
+    except Exception as e:
+        logger.error(f"Failed to load {provider} quota usage: {str(e)}")
+        return 0, False
+    finally:
+        db.close()
+
+
+def save_quota_usage(provider: str, day: str, used: int, exhausted: bool):
+    db = SessionLocal()
+    try:
+        usage = db.query(NewsApiQuotaUsage).filter(
+            NewsApiQuotaUsage.provider == provider,
+            NewsApiQuotaUsage.day == day
+        ).first()
+        if usage is None:
+            usage = NewsApiQuotaUsage(provider=provider, day=day)
+            db.add(usage)
+        usage.used = used
+        usage.exhausted = exhausted
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to save {provider} quota usage: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+class DailyQuota:
+    """Request budget of one API, reset at 00:00 UTC (when both providers reset)
+    
+    Usage is stored per UTC day, so restarts don't reset the budget.
+    """
+    
+    def __init__(self, provider: str, daily_limit: int):
+        self.provider = provider
+        self.daily_limit = daily_limit
+        self.used = 0
+        self.exhausted = False
+        self.day = None  # Loaded from the database on first use
+        self._lock = threading.Lock()
+    
+    def _roll_over(self):
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.used, self.exhausted = load_quota_usage(self.provider, today.isoformat())
+    
+    def _save(self):
+        save_quota_usage(self.provider, self.day.isoformat(), self.used, self.exhausted)
+    
+    def try_acquire(self) -> bool:
+        """Reserve one request, returns False when the budget is used up"""
+        with self._lock:
+            self._roll_over()
+            if self.exhausted or (self.daily_limit > 0 and self.used >= self.daily_limit):
+                return False
+            self.used += 1
+            self._save()
+            return True
+    
+    def mark_exhausted(self):
+        """The API answered 429, don't call it again today"""
+        with self._lock:
+            self._roll_over()
+            self.exhausted = True
+            self._save()
+    
+    def remaining(self) -> Optional[int]:
+        with self._lock:
+            self._roll_over()
+            if self.exhausted:
+                return 0
+            if self.daily_limit <= 0:
+                return None  # Unlimited
+            return max(0, self.daily_limit - self.used)
+
+
+class ApiProvider:
+    """Request / response format of one news search API"""
+    
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        daily_quota: int,
+        max_query_length: int,
+        request: Callable[["ApiProvider", str, int], List[Dict]]
+    ):
+        self.name = name
+        self.api_key = api_key
+        self.quota = DailyQuota(name, daily_quota)
+        self.max_query_length = max_query_length
+        self.request = request
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+
+def _get_json(url: str, params: Dict) -> Dict:
+    response = get_http_session().get(url, params=params, timeout=http_timeout(settings.NEWS_API_TIMEOUT), stream=True)
+    try:
+        if response.status_code == 429:
+            raise QuotaExceededError(f"{url} answered 429 Too Many Requests")
+        response.raise_for_status()
+        return json.loads(read_limited(response, settings.NEWS_API_MAX_BYTES, settings.NEWS_API_DEADLINE_SECONDS))
+    finally:
+        response.close()
+
+
+def _request_gnews(provider: ApiProvider, query: str, max_articles: int) -> List[Dict]:
+    data = _get_json("https://gnews.io/api/v4/search", {
+        "q": query,
+        "lang": "zh",  # Chinese, change to "en" for English
+        "country": "cn",  # China, change to "us" for USA
+        "max": max_articles,
+        "apikey": provider.api_key,
+        "sortby": "publishedAt"
+    })
+    
+    articles = []
+    for item in data.get("articles", [])[:max_articles]:
+        articles.append({
+            "title": item.get("title", ""),
+            "url": item.get("url", ""),
+            "source": item.get("source", {}).get("name", "GNews"),
+            "published_at": parse_datetime(item.get("publishedAt"), source="gnews"),
+            "content": item.get("description", ""),
+            "image_url": item.get("image")
+        })
+    return articles
+
+
+def _request_newsdata(provider: ApiProvider, query: str, max_articles: int) -> List[Dict]:
+    data = _get_json("https://newsdata.io/api/1/news", {
+        "apikey": provider.api_key,
+        "q": query,
+        "language": "zh,en",
+        "size": max_articles
+    })
+    
+    articles = []
+    for item in data.get("results", [])[:max_articles]:
+        articles.append({
+            "title": item.get("title", ""),
+            "url": item.get("link", ""),
+            "source": item.get("source_id", "NewsData"),
+            "published_at": parse_datetime(item.get("pubDate"), source="newsdata"),
+            "content": item.get("description", "") or item.get("content", ""),
+            "image_url": item.get("image_url")
+        })
+    return articles
+
+
+def build_or_query(topics: List[str]) -> str:
+    """Combine topics into one query, quoting multi-word topics"""
+    terms = [f'"{topic}"' if " " in topic else topic for topic in topics]
+    return " OR ".join(terms)
+
+
+def article_matches_topic(article: Dict, topic: str) -> bool:
+    """Whether a batched search result belongs to a topic
+    
+    The search APIs match topics loosely (e.g. 国际时事 finds articles that
+    mention 国际 and 时事 apart), so an article matches when it contains at
+    least TOPIC_MATCH_MIN_COVERAGE of the topic's words / CJK bigrams.
+    Topics without such terms fall back to a plain substring match.
+    """
+    text = f"{article.get('title') or ''} {article.get('content') or ''}"
+    topic_terms = extract_features(topic)
+    if not topic_terms:
+        return topic.lower() in text.lower()
+    text_terms = extract_features(text)
+    covered = sum(1 for term in topic_terms if term in text_terms)
+    return covered / len(topic_terms) >= TOPIC_MATCH_MIN_COVERAGE
+
+
+class NewsApiClient:
+    """Quota-aware GNews / NewsData client
+    
+    Tracks each API's daily budget, caches results per (provider, topic) for
+    NEWS_API_CACHE_TTL_SECONDS and can prefetch many topics with a few OR
+    queries, splitting the results back per topic by keyword match.
+    """
+    
+    def __init__(self, providers: Dict[str, ApiProvider], cache_ttl_seconds: int, batch_size: int):
+        self.providers = providers
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.batch_size = max(1, batch_size)
+        # (provider, topic) -> (expires_at, articles)
+        self._cache: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def _cache_get(self, provider: str, topic: str) -> Optional[List[Dict]]:
+        with self._lock:
+            cached = self._cache.get((provider, topic))
+            if cached is None:
+                return None
+            expires_at, articles = cached
+            if time.monotonic() >= expires_at:
+                del self._cache[(provider, topic)]
+                return None
+            return [dict(article) for article in articles]
+    
+    def _cache_put(self, provider: str, topic: str, articles: List[Dict]):
+        with self._lock:
+            self._cache[(provider, topic)] = (time.monotonic() + self.cache_ttl_seconds, articles)
+    
+    def _request(self, provider: ApiProvider, query: str, max_articles: int) -> Optional[List[Dict]]:
+        """One API call, None when skipped (no budget) or failed"""
+        if not provider.quota.try_acquire():
+            logger.info(f"{provider.name} daily quota used up, skipping query: {query}")
+            return None
+        try:
+            return provider.request(provider, query, max_articles)
+        except QuotaExceededError:
+            provider.quota.mark_exhausted()
+            logger.warning(f"{provider.name} returned 429, quota exhausted until tomorrow")
+        except Exception as e:
+            logger.error(f"{provider.name} fetch error: {str(e)}")
+        return None
+    
+    def search(self, provider_name: str, topic: str, max_articles: int) -> List[Dict]:
+        """Articles for one topic, from cache or a single-topic query"""
+        provider = self.providers[provider_name]
+        if not provider.enabled:
+            return []
+        
+        cached = self._cache_get(provider_name, topic)
+        if cached is not None:
+            return cached[:max_articles]
+        
+        articles = self._request(provider, topic, max_articles)
+        if articles is None:
+            return []
+        self._cache_put(provider_name, topic, articles)
+        return [dict(article) for article in articles]
+    
+    def _batches(self, provider: ApiProvider, topics: List[str]) -> List[List[str]]:
+        """Group topics into OR queries within the provider's query length limit"""
+        batches = []
+        batch: List[str] = []
+        for topic in topics:
+            candidate = batch + [topic]
+            if batch and (len(candidate) > self.batch_size or len(build_or_query(candidate)) > provider.max_query_length):
+                batches.append(batch)
+                batch = [topic]
+            else:
+                batch = candidate
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def prefetch(self, topics: List[str], max_articles: int) -> Dict[str, int]:
+        """Warm the cache for many topics with as few requests as possible
+        
+        Topics a batched query found nothing for are left uncached, so a later
+        search() can still try a dedicated query. Returns requests sent per provider.
+        """
+        requests_sent = {}
+        for name, provider in self.providers.items():
+            if not provider.enabled:
+                continue
+            pending = [topic for topic in dict.fromkeys(topics) if self._cache_get(name, topic) is None]
+            requests_sent[name] = 0
+            
+            for batch in self._batches(provider, pending):
+                page_size = min(max_articles * len(batch), settings.NEWS_API_MAX_PAGE_SIZE)
+                articles = self._request(provider, build_or_query(batch), page_size)
+                if articles is None:
+                    if provider.quota.remaining() == 0:
+                        break
+                    continue
+                requests_sent[name] += 1
+                
+                if len(batch) == 1:
+                    self._cache_put(name, batch[0], articles)
+                    continue
+                for topic in batch:
+                    matched = [article for article in articles if article_matches_topic(article, topic)]
+                    if matched:
+                        self._cache_put(name, topic, matched[:max_articles])
+            
+            logger.info(
+                f"Prefetched {len(pending)} topics from {name} with {requests_sent[name]} requests "
+                f"(remaining quota: {provider.quota.remaining()})"
+            )
+        return requests_sent
+    
+    def quota_status(self) -> Dict[str, Optional[int]]:
+        return {name: provider.quota.remaining() for name, provider in self.providers.items()}
+
+
+# Singleton instance
+_client_instance = None
+_client_lock = threading.Lock()
+
+
+def get_news_api_client() -> NewsApiClient:
+    """Get singleton news API client"""
+    global _client_instance
+    if _client_instance is None:
+        with _client_lock:
+            if _client_instance is None:
+                _client_instance = NewsApiClient(
+                    providers={
+                        PROVIDER_GNEWS: ApiProvider(
+                            PROVIDER_GNEWS,
+                            settings.GNEWS_API_KEY,
+                            settings.GNEWS_DAILY_QUOTA,
+                            max_query_length=200,
+                            request=_request_gnews
+                        ),
+                        PROVIDER_NEWSDATA: ApiProvider(
+                            PROVIDER_NEWSDATA,
+                            settings.NEWSDATA_API_KEY,
+                            settings.NEWSDATA_DAILY_QUOTA,
+                            max_query_length=100,
+                            request=_request_newsdata
+                        ),
+                    },
+                    cache_ttl_seconds=settings.NEWS_API_CACHE_TTL_SECONDS,
+                    batch_size=settings.NEWS_API_BATCH_SIZE
+                )
+    return _client_instance
@@ -1,123 +1,56 @@
-import requests
 import feedparser
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from database import settings
+from feed_state import (
+    FETCH_OK,
+    FETCH_NOT_MODIFIED,
+    FETCH_ERROR,
+    get_feed_validators,
+    save_feed_validators,
+    defer_feed_validators,
+    remember_feed_entries,
+    replay_feed_entries
+)
+from http_client import get_http_session, http_timeout, iter_limited, read_limited
+from http_fixtures import get_fixture_mode, MODE_OFF
+from feed_health import get_feed_health
+from feed_cycle import FeedFetchCycle
+from feed_registry import FeedRegistrySnapshot, get_feed_registry
+from dedup import SimHashIndex, article_fingerprint, fingerprint_to_hex
+from url_utils import canonicalize_url
+from feed_stream import stream_parse_feed
+from feed_parsing import check_feed, entries_to_articles, feed_links, parse_feed_articles
+from websub import note_feed_hub
+from topic_index import get_topic_index, warm_topic_index_from_cache
+from news_api_client import get_news_api_client, PROVIDER_GNEWS, PROVIDER_NEWSDATA
 import logging
-import hashlib
-import uuid
+import multiprocessing
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Some feed hosts (e.g. reddit) reject the default python-requests User-Agent
+FEED_USER_AGENT = "Mozilla/5.0 (compatible; DailyDigestBot/1.0; +https://github.com/tanghuanqiang/Daily-News)"
+
 
 class NewsFetcher:
     """Multi-source news fetcher with fallback support"""
     
-    def __init__(self, custom_rss_feeds: List[Dict] = None):
+    def __init__(self, feed_cycle: Optional[FeedFetchCycle] = None, feeds: Optional[FeedRegistrySnapshot] = None):
+        self.feed_cycle = feed_cycle  # Shares feed downloads across topics within one refresh run
         self.gnews_api_key = settings.GNEWS_API_KEY
         self.newsdata_api_key = settings.NEWSDATA_API_KEY
         
-        # RSS Feed sources as fallback
-        self.rss_feeds = {
-            "科技": [
-                "https://www.theverge.com/rss/index.xml",
-                "https://techcrunch.com/feed/",
-                "https://www.wired.com/feed/rss",
-                "https://www.engadget.com/rss.xml",
-            ],
-            "AI": [
-                "https://www.artificialintelligence-news.com/feed/",
-                "https://www.technologyreview.com/feed/",
-                "https://www.vox.com/rss/index.xml",
-                "https://www.reddit.com/r/artificial.rss",
-            ],
-            "财经": [
-                "https://www.economist.com/business/rss.xml",
-                "https://www.marketwatch.com/rss/topstories",
-                "https://finance.yahoo.com/rss/topstories",
-                "https://www.bloomberg.com/feeds/news.rss",
-            ],
-            "股市": [
-                "https://finance.yahoo.com/rss/finance/rssindex",
-                "https://www.cnbc.com/id/100003114/device/rss/rss.html",
-            ],
-            "国际时事": [
-                "https://feeds.bbci.co.uk/news/world/rss.xml",
-                "https://www.nytimes.com/svc/collections/v1/publish/https://www.nytimes.com/section/world/rss.xml",
-                "https://www.reddit.com/r/worldnews.rss",
-                "https://www.vox.com/rss/index.xml",
-            ],
-            "国际": [
-                "https://feeds.bbci.co.uk/news/world/rss.xml",
-                "https://www.reddit.com/r/worldnews.rss",
-            ],
-            "科学": [
-                "https://www.nature.com/nature.rss",
-                "https://www.science.org/rss/news_current.xml",
-                # removed unstable scientificamerican feed, keep Nature/Science/ScienceDaily
-                "https://www.sciencedaily.com/rss/all.xml",
-            ],
-            "娱乐": [
-                "https://www.theguardian.com/uk/culture/rss",
-                "https://www.indiewire.com/feed/rss",
-                "https://www.variety.com/feed/",
-            ],
-            "体育": [
-                "https://www.espn.com/espn/rss/news",
-                "https://feeds.bbci.co.uk/sport/rss.xml",
-                "https://sports.yahoo.com/rss/",
-                "https://www.cbssports.com/rss/headlines/",
-            ],
-            "搞笑": [
-                "https://www.theonion.com/rss",
-                "https://www.boredpanda.com/feed/",
-                "https://www.cheezburger.com/rss",
-            ],
-            "奇闻": [
-                "https://nypost.com/feed/",
-                "https://www.mirror.co.uk/news/rss.xml",
-                "https://www.telegraph.co.uk/news/rss.xml",
-                "https://www.nytimes.com/services/xml/rss/nyt/HomePage.xml",
-            ],
-            # 中文技术/编程/开发者社区（强烈推荐）- 每个RSS源作为独立主题
-            "阮一峰的网络日志": [
-                "https://www.ruanyifeng.com/blog/atom.xml",
-            ],
-            "酷壳 CoolShell": [
-                "https://coolshell.cn/feed",
-            ],
-            "美团技术团队": [
-                "https://tech.meituan.com/feed",
-            ],
-            "少数派（数字生产力）": [
-                "https://sspai.com/feed",
-            ],
-            "玉伯的博客/蚂蚁体验": [
-                "https://www.yuque.com/yubo/blog/rss",
-            ],
-            "粥里有勺糖": [
-                "https://www.zhihu.com/people/shao-nian-ge-xing-68-13/posts/rss",
-            ],
-            "黑泽的博客": [
-                "https://heizex.com/feed",
-            ],
-            "独立开发者周刊": [
-                "https://indiehackers.feeds.cn/rss",
-            ]
-        }
-        
-        # Add custom RSS feeds if provided
-        if custom_rss_feeds:
-            for feed in custom_rss_feeds:
-                if feed.get('is_active'):
-                    topic = feed.get('topic')
-                    feed_url = feed.get('feed_url')
-                    if topic and feed_url:
-                        if topic not in self.rss_feeds:
-                            self.rss_feeds[topic] = []
-                        if feed_url not in self.rss_feeds[topic]:
-                            self.rss_feeds[topic].append(feed_url)
+        # RSS Feed sources (defaults + active custom feeds), read-only topic -> feeds mapping
+        self.feeds = feeds if feeds is not None else get_feed_registry().snapshot()
+        self.rss_feeds = self.feeds.topic_feeds
+        # Feeds whose entries went into a fetch_news() result; the caller stores
+        # their validators once the articles are ingested (commit_feed_validators)
+        self.used_feeds = set()
     
     def fetch_news(self, topic: str, max_articles: int = 8) -> List[Dict]:
         """
@@ -149,9 +82,8 @@ class NewsFetcher:
         # Fallback to RSS feeds
         try:
             articles = self._fetch_from_rss(topic, max_articles)
-            if articles:
-                logger.info(f"Fetched {len(articles)} articles from RSS for topic: {topic}")
-                return articles
+            logger.info(f"Fetched {len(articles)} articles from RSS for topic: {topic}")
+            return articles
         except Exception as e:
             logger.error(f"RSS fetch error for {topic}: {str(e)}")
         
@@ -166,195 +98,309 @@ class NewsFetcher:
             "image_url": None
         }]
     
-    def _fetch_from_gnews(self, topic: str, max_articles: int) -> List[Dict]:
-        """Fetch from GNews API"""
-        url = "https://gnews.io/api/v4/search"
-        params = {
-            "q": topic,
-            "lang": "zh",  # Chinese, change to "en" for English
-            "country": "cn",  # China, change to "us" for USA
-            "max": max_articles,
-            "apikey": self.gnews_api_key,
-            "sortby": "publishedAt"
-        }
+    def fetch_feed(self, feed_url: str, max_articles: int = 16) -> Tuple[str, List[Dict]]:
+        """Fetch a single RSS feed
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for item in data.get("articles", [])[:max_articles]:
-                articles.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "source": item.get("source", {}).get("name", "GNews"),
-                    "published_at": self._parse_datetime(item.get("publishedAt")),
-                    "content": item.get("description", ""),
-                    "image_url": item.get("image")
-                })
-            return articles
-        except Exception as e:
-            logger.error(f"GNews fetch error: {str(e)}")
-            return []
+        Returns (status, articles): FETCH_OK with the parsed entries,
+        FETCH_NOT_MODIFIED with the last parsed entries replayed, or
+        FETCH_ERROR with no entries (failed, or skipped by the circuit breaker).
+        The caller stores the feed's validators with commit_feed_validators()
+        once the entries are ingested.
+        """
+        per_feed = max(max_articles, settings.RSS_ENTRIES_PER_FEED)
+        status, articles = self._download_feed_result(feed_url, per_feed)
+        return status, articles[:max_articles]
     
-    def _fetch_from_newsdata(self, topic: str, max_articles: int) -> List[Dict]:
-        """Fetch from NewsData.io API"""
-        url = "https://newsdata.io/api/1/news"
-        params = {
-            "apikey": self.newsdata_api_key,
-            "q": topic,
-            "language": "zh,en",
-            "size": max_articles
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for item in data.get("results", [])[:max_articles]:
-                articles.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "source": item.get("source_id", "NewsData"),
-                    "published_at": self._parse_datetime(item.get("pubDate")),
-                    "content": item.get("description", "") or item.get("content", ""),
-                    "image_url": item.get("image_url")
-                })
-            return articles
-        except Exception as e:
-            logger.error(f"NewsData fetch error: {str(e)}")
-            return []
+    def _fetch_from_gnews(self, topic: str, max_articles: int) -> List[Dict]:
+        """Fetch from GNews API (quota-aware, cached per topic)"""
+        return get_news_api_client().search(PROVIDER_GNEWS, topic, max_articles)
     
-    def _generate_entry_id(self, feed_url: str, entry) -> str:
-        """Generate unique entry ID from feed_url + guid/link"""
-        # Try guid first, then link, then id
-        guid = entry.get("id") or entry.get("guid") or entry.get("link", "")
-        
-        if not guid:
-            # Last resort: use title + url hash
-            title = entry.get("title", "")
-            url = entry.get("link", "")
-            guid = f"{title}:{url}"
-        
-        # Create hash from feed_url + guid
-        combined = f"{feed_url}:{guid}"
-        entry_id = hashlib.sha256(combined.encode('utf-8')).hexdigest()
-        return entry_id
+    def _fetch_from_newsdata(self, topic: str, max_articles: int) -> List[Dict]:
+        """Fetch from NewsData.io API (quota-aware, cached per topic)"""
+        return get_news_api_client().search(PROVIDER_NEWSDATA, topic, max_articles)
     
     def _fetch_from_rss(self, topic: str, max_articles: int) -> List[Dict]:
-        """Fetch from RSS feeds (fallback)"""
+        """Fetch from RSS feeds (fallback)
+
+        Feeds are downloaded concurrently (bounded by RSS_FETCH_CONCURRENCY),
+        but merged in feed order so the result is the same as a sequential run.
+        Pending downloads are cancelled once max_articles entries are collected.
+        """
         articles = []
         
         # Find relevant RSS feeds for the topic
         feeds = self.rss_feeds.get(topic, [])
         
-        # If no exact match, use all feeds and filter by keyword
+        # No exact match: free-text topic, answer from the entry index
         if not feeds:
-            feeds = [feed for feed_list in self.rss_feeds.values() for feed in feed_list]
+            return self._search_topic_index(topic, max_articles)
+        
+        concurrency = max(1, min(settings.RSS_FETCH_CONCURRENCY, len(feeds)))
         
-        # Try all feeds, not just the first 3
-        for feed_url in feeds:
+        if concurrency == 1:
+            # Sequential mode
+            for feed_url in feeds:
+                feed_articles = self._fetch_feed_entries(feed_url, max_articles - len(articles))
+                if feed_articles:
+                    articles.extend(feed_articles)
+                    self.used_feeds.add(feed_url)
+                if len(articles) >= max_articles:
+                    break
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rss-fetch")
             try:
-                feed = feedparser.parse(feed_url)
-                if not hasattr(feed, 'entries') or not feed.entries:
-                    continue
+                future_to_index = {
+                    executor.submit(self._fetch_feed_entries, feed_url, max_articles): index
+                    for index, feed_url in enumerate(feeds)
+                }
+                results = {}
+                next_index = 0
                 
-                for entry in feed.entries[:max_articles]:
-                    # Don't filter by topic keyword, keep all articles
-                    title = entry.get("title", "")
-                    summary = entry.get("summary", "")
+                for future in as_completed(future_to_index):
+                    results[future_to_index[future]] = future.result()
                     
-                    # Skip empty articles
-                    if not title and not summary:
-                        continue
-                    
-                    # Generate unique entry ID
-                    entry_id = self._generate_entry_id(feed_url, entry)
-                    
-                    articles.append({
-                        "title": title,
-                        "url": entry.get("link", ""),
-                        "source": feed.feed.get("title", "RSS Feed"),
-                        "published_at": self._parse_datetime(entry.get("published")),
-                        "content": summary,
-                        "image_url": self._extract_image_from_entry(entry),
-                        "entry_id": entry_id,  # Add entry_id for RSS articles
-                        "feed_url": feed_url  # Add feed_url for tracking
-                    })
+                    # Merge finished feeds in feed order (deterministic)
+                    while next_index in results and len(articles) < max_articles:
+                        feed_articles = results.pop(next_index)
+                        if feed_articles:
+                            articles.extend(feed_articles[:max_articles - len(articles)])
+                            self.used_feeds.add(feeds[next_index])
+                        next_index += 1
                     
                     if len(articles) >= max_articles:
                         break
-                
-                if len(articles) >= max_articles:
-                    break
-                    
-            except Exception as e:
-                logger.error(f"RSS feed error for {feed_url}: {str(e)}")
-                continue
+            finally:
+                # Don't wait for slow feeds once we have enough articles
+                executor.shutdown(wait=False, cancel_futures=True)
         
         # If still no articles, use a default article
         if not articles:
-            articles.append({
-                "title": f"暂无{topic}相关新闻",
-                "url": "",
-                "source": "系统消息",
-                "published_at": datetime.now(),
-                "content": f"我们正在努力为您获取{topic}相关新闻，请稍后刷新重试。",
-                "image_url": None,
-                "entry_id": None,  # Default article has no entry_id
-                "feed_url": None
-            })
+            articles.append(self._placeholder_article(topic))
+        
+        return articles[:max_articles]
+    
+    def _search_topic_index(self, topic: str, max_articles: int) -> List[Dict]:
+        """Match a free-text topic against already fetched feed entries
+        
+        Ranks indexed entries with BM25 instead of downloading every feed. The
+        index is filled by regular feed fetches and the scheduled poll; when it
+        is empty (e.g. right after startup) it is filled from recently stored
+        news, never by downloading feeds here.
+        """
+        index = get_topic_index()
+        if len(index) == 0:
+            warm_topic_index_from_cache(index)
+        
+        articles = index.search(topic, max_articles)
+        if not articles:
+            articles.append(self._placeholder_article(topic))
+        return articles
+    
+    def _placeholder_article(self, topic: str) -> Dict:
+        """Default article stored when no news was found for a topic"""
+        return {
+            "title": f"暂无{topic}相关新闻",
+            "url": "",
+            "source": "系统消息",
+            "published_at": datetime.now(),
+            "content": f"我们正在努力为您获取{topic}相关新闻，请稍后刷新重试。",
+            "image_url": None,
+            "entry_id": None,  # Default article has no entry_id
+            "feed_url": None
+        }
+    
+    def _fetch_feed_entries(self, feed_url: str, max_articles: int) -> List[Dict]:
+        """Fetch and parse a single RSS feed, returning at most max_articles entries
         
+        Within a refresh cycle each feed URL is only downloaded once. The download
+        always parses RSS_ENTRIES_PER_FEED entries, whatever this caller needs,
+        so topics sharing the feed later in the cycle get the full list.
+        """
+        per_feed = max(max_articles, settings.RSS_ENTRIES_PER_FEED)
+        if self.feed_cycle is not None:
+            articles = self.feed_cycle.fetch(
+                feed_url,
+                lambda: self._download_feed_entries(feed_url, per_feed)
+            )
+        else:
+            articles = self._download_feed_entries(feed_url, per_feed)
         return articles[:max_articles]
     
-    def _extract_image_from_entry(self, entry) -> Optional[str]:
-        """Extract image URL from RSS entry"""
-        # Try media:content
-        if hasattr(entry, 'media_content') and entry.media_content:
-            return entry.media_content[0].get('url')
+    def _download_feed_entries(self, feed_url: str, max_articles: int) -> List[Dict]:
+        """Download a single RSS feed and convert its entries to articles ([] on failure)"""
+        return self._download_feed_result(feed_url, max_articles)[1]
+    
+    def _download_feed_result(self, feed_url: str, max_articles: int) -> Tuple[str, List[Dict]]:
+        """Download a single RSS feed, returning (fetch status, articles)
         
-        # Try media:thumbnail
-        if hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
-            return entry.media_thumbnail[0].get('url')
+        Fetched entries are also added to the topic index for free-text topics.
+        """
+        # Skip feeds whose circuit is open (recently failing)
+        health = get_feed_health()
+        if not health.allow_request(feed_url):
+            logger.info(f"Skipping unhealthy RSS feed: {feed_url}")
+            return FETCH_ERROR, []
         
-        # Try enclosures
-        if hasattr(entry, 'enclosures') and entry.enclosures:
-            for enclosure in entry.enclosures:
-                if 'image' in enclosure.get('type', ''):
-                    return enclosure.get('url')
+        started = time.monotonic()
+        try:
+            status, articles = self._download_feed(feed_url, max_articles)
+        except Exception as e:
+            health.record_failure(feed_url, str(e), time.monotonic() - started)
+            logger.error(f"RSS feed error for {feed_url}: {str(e)}")
+            return FETCH_ERROR, []
+        health.record_success(feed_url, time.monotonic() - started)
         
-        return None
+        if articles and status == FETCH_OK:
+            get_topic_index().add_articles(articles)
+        return status, articles
     
-    def _parse_datetime(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse various datetime formats"""
-        if not date_str:
-            return None
+    def _download_feed(self, feed_url: str, max_articles: int) -> Tuple[str, List[Dict]]:
+        """Download and parse a feed with a conditional GET
+        
+        Sends the stored ETag / Last-Modified validators when the feed's last
+        parsed entries are still in memory, and replays those entries on 304
+        Not Modified. The new validators of a 200 are only held back
+        (defer_feed_validators): they are stored once the entries are ingested,
+        so entries fetched but not used are not hidden behind 304s. In "stream" parse mode
+        the body is parsed while downloading and reading stops after
+        max_articles usable entries. With RSS_PARSE_PROCESSES > 0 the body is
+        parsed in a worker process instead. Bodies are capped at RSS_MAX_BYTES
+        (decompressed) and RSS_DOWNLOAD_DEADLINE_SECONDS.
+        """
+        headers = {"User-Agent": FEED_USER_AGENT}
+        # Fixture recordings must contain full bodies, not 304s
+        use_validators = settings.RSS_CONDITIONAL_GET and get_fixture_mode() == MODE_OFF
+        # A 304 is only useful while there are entries to replay
+        replay = replay_feed_entries(feed_url) if use_validators else None
+        if replay is not None:
+            validators = get_feed_validators(feed_url)
+            if validators["etag"]:
+                headers["If-None-Match"] = validators["etag"]
+            if validators["last_modified"]:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        
+        response = get_http_session().get(
+            feed_url,
+            headers=headers,
+            timeout=http_timeout(settings.RSS_FETCH_TIMEOUT),
+            stream=True
+        )
         
         try:
-            # ISO format (GNews)
-            if 'T' in date_str and 'Z' in date_str:
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            if response.status_code == 304 and replay is not None:
+                save_feed_validators(feed_url, 304)
+                logger.debug(f"RSS feed not modified, replaying {len(replay)} entries: {feed_url}")
+                return FETCH_NOT_MODIFIED, replay[:max_articles]
+            
+            response.raise_for_status()
             
-            # Try common formats
-            from dateutil import parser
-            return parser.parse(date_str)
-        except:
-            return None
+            # Pass response headers so feedparser can detect encoding and resolve relative links
+            response_headers = dict(response.headers)
+            response_headers.setdefault("content-location", response.url)
+            stream = settings.RSS_PARSE_MODE == "stream"
+            
+            if settings.RSS_PARSE_PROCESSES > 0:
+                # CPU-bound parsing off the GIL: only plain dicts come back
+                future = get_parse_pool().submit(
+                    parse_feed_articles,
+                    read_limited(response, settings.RSS_MAX_BYTES, settings.RSS_DOWNLOAD_DEADLINE_SECONDS),
+                    feed_url,
+                    max_articles,
+                    response_headers,
+                    stream
+                )
+                articles, links = future.result(timeout=settings.RSS_FETCH_TIMEOUT)
+            else:
+                if stream:
+                    feed = stream_parse_feed(
+                        iter_limited(response, settings.RSS_MAX_BYTES, settings.RSS_DOWNLOAD_DEADLINE_SECONDS),
+                        max_articles,
+                        response_headers=response_headers
+                    )
+                else:
+                    body = read_limited(response, settings.RSS_MAX_BYTES, settings.RSS_DOWNLOAD_DEADLINE_SECONDS)
+                    feed = feedparser.parse(body, response_headers=response_headers)
+                check_feed(feed)
+                articles = entries_to_articles(feed, feed_url, max_articles)
+                links = feed_links(feed)
+            
+            # Feeds advertising a WebSub hub can push new entries instead of being polled
+            note_feed_hub(feed_url, links, response.links)
+        finally:
+            # Stops the download if the stream parser finished early
+            response.close()
+        
+        remember_feed_entries(feed_url, articles)
+        if use_validators:
+            defer_feed_validators(
+                feed_url,
+                response.status_code,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        
+        return FETCH_OK, articles
+
 
+# Process pool for feed parsing (RSS_PARSE_PROCESSES > 0)
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
 
-# Deduplicate articles by URL
-def deduplicate_articles(articles: List[Dict]) -> List[Dict]:
-    """Remove duplicate articles based on URL"""
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get the shared feed parsing process pool"""
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                # spawn: forking a process that runs scheduler / server threads is unsafe
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=settings.RSS_PARSE_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Feed parsing process pool started ({settings.RSS_PARSE_PROCESSES} workers)")
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the feed parsing process pool"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+# Deduplicate articles by URL and content fingerprint
+def deduplicate_articles(articles: List[Dict], recent_fingerprints: Iterable[int] = ()) -> List[Dict]:
+    """Remove duplicate articles based on canonical URL and near-duplicate content
+    
+    URLs are compared after canonicalization (tracking parameters, AMP and
+    mobile variants removed). The same wire story published by several sources
+    gets a near-identical SimHash of title + content and is kept only once.
+    recent_fingerprints are fingerprints of already stored articles, their
+    near-duplicates are dropped too.
+    Kept articles get "canonical_url" and "simhash" (hex string or None) keys.
+    """
     seen_urls = set()
+    index = SimHashIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE, recent_fingerprints)
     unique_articles = []
     
     for article in articles:
-        url = article.get("url", "")
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            unique_articles.append(article)
+        url = canonicalize_url(article.get("url", ""))
+        if not url or url in seen_urls:
+            continue
+        
+        fingerprint = article_fingerprint(article.get("title", ""), article.get("content", ""))
+        if fingerprint is not None:
+            if index.find_near(fingerprint) is not None:
+                logger.debug(f"Dropping near-duplicate article: {article.get('title', '')[:50]}")
+                continue
+            index.add(fingerprint)
+        
+        seen_urls.add(url)
+        article["canonical_url"] = url
+        article["simhash"] = fingerprint_to_hex(fingerprint)
+        unique_articles.append(article)
     
     return unique_articles
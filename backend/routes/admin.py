@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from typing import Optional
+from auth import get_current_admin_user
+from models import User
+from feed_health import get_feed_health
+from news_api_client import get_news_api_client
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/feed-health")
+async def get_feed_health_status(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get health and circuit breaker state of every fetched RSS feed"""
+    feeds = get_feed_health().snapshot()
+    # Worst feeds first
+    feeds.sort(key=lambda f: (f["state"] == "closed", -f["consecutive_failures"], f["feed_url"]))
+    return {
+        "feeds": feeds,
+        "count": len(feeds),
+        "open_count": sum(1 for f in feeds if f["state"] != "closed")
+    }
+
+
+@router.post("/feed-health/reset")
+async def reset_feed_health(
+    feed_url: Optional[str] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reset health state for one feed (or all feeds), closing its circuit"""
+    get_feed_health().reset(feed_url)
+    return {"success": True, "feed_url": feed_url}
+
+
+@router.get("/news-api-quota")
+async def get_news_api_quota(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get the remaining daily request budget of GNews / NewsData (null = unlimited)"""
+    return {"remaining": get_news_api_client().quota_status()}
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import FileResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from typing import List, Optional
 from datetime import datetime, date
-from database import get_db, SessionLocal
+from database import get_db, SessionLocal, settings
 from models import (
     NewsCache, 
     Subscription,
@@ -13,10 +14,21 @@ from models import (
     TopicRefreshStatus,
     UserPreference,
     UserNewsInteraction,
-    CustomRSSFeed
+    CustomRSSFeed,
+    WebSubSubscription
 )
 from auth import get_current_active_user
-from scheduler import refresh_topic_with_lock, can_refresh_topic, get_or_create_refresh_status
+from scheduler import (
+    refresh_topic_with_lock,
+    can_refresh_topic,
+    get_or_create_refresh_status,
+    ingest_feed_push,
+    claim_roast_generation,
+    generate_roast_summaries
+)
+from feed_cycle import FeedFetchCycle
+from image_cache import get_image_cache, is_valid_image_key
+from websub import accept_push, verify_intent
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +44,7 @@ def get_or_create_user_preference(user_id: int, db: Session) -> UserPreference:
 
 @router.get("/dashboard", response_model=DashboardResponse)
 async def get_dashboard(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     date_filter: Optional[str] = None
@@ -80,6 +93,7 @@ async def get_dashboard(
     
     topics_data = []
     last_global_update = None
+    missing_roast_ids = []
     
     # Get read news IDs for this user
     read_news_ids = set()
@@ -123,6 +137,11 @@ async def get_dashboard(
             if not last_global_update or latest_update > last_global_update:
                 last_global_update = latest_update
             
+            # Roast summaries are generated after the first view for topics nobody read in roast mode
+            # before; until then the dashboard shows the plain summary
+            if config["roast_mode"]:
+                missing_roast_ids.extend(item.id for item in news_items if not item.summary_roast)
+            
             # Get read status for each news item
             news_ids = [item.id for item in news_items]
             read_status_map = {}
@@ -163,6 +182,10 @@ async def get_dashboard(
                 "roast_mode": config["roast_mode"]
             })
     
+    roast_ids = claim_roast_generation(missing_roast_ids)
+    if roast_ids:
+        background_tasks.add_task(generate_roast_summaries, roast_ids)
+    
     return {
         "topics": topics_data,
         "last_global_update": last_global_update
@@ -194,6 +217,67 @@ async def get_news_by_topic(
     }
 
 
+@router.get("/image/{key}")
+async def get_cached_image(key: str):
+    """Serve a cached article thumbnail (no auth: loaded by <img> tags)"""
+    cached = get_image_cache().get(key) if is_valid_image_key(key) else None
+    if not cached:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    path, content_type = cached
+    # Keys are content-stable (hash of the article URL), safe to cache for long.
+    # Same origin as the SPA: never let the browser sniff or run anything from here.
+    return FileResponse(path, media_type=content_type, headers={
+        "Cache-Control": "public, max-age=604800, immutable",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "default-src 'none'; sandbox"
+    })
+
+
+@router.get("/websub/{token}")
+async def websub_verify(token: str, request: Request, db: Session = Depends(get_db)):
+    """WebSub callback: the hub verifies a subscribe / unsubscribe request"""
+    subscription = db.query(WebSubSubscription).filter(WebSubSubscription.callback_token == token).first()
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Unknown subscription")
+    
+    challenge = verify_intent(db, subscription, request.query_params)
+    if challenge is None:
+        raise HTTPException(status_code=404, detail="Subscription not requested")
+    return PlainTextResponse(challenge)
+
+
+@router.post("/websub/{token}", status_code=202)
+async def websub_push(
+    token: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """WebSub callback: the hub pushes new feed content (ingested in the background)"""
+    subscription = db.query(WebSubSubscription).filter(WebSubSubscription.callback_token == token).first()
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Unknown subscription")
+    
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > settings.WEBSUB_MAX_PUSH_BYTES:
+            raise HTTPException(status_code=413, detail="Push content too large")
+    body = bytes(body)
+    
+    # Content for an unverified subscription or with a bad signature must still be acknowledged, but is ignored
+    if not accept_push(subscription, body, request.headers.get("X-Hub-Signature")):
+        logger.warning(f"Ignoring WebSub push for {subscription.feed_url} (state {subscription.state})")
+        return {"accepted": False}
+    
+    subscription.last_push_at = datetime.utcnow()
+    db.commit()
+    
+    background_tasks.add_task(ingest_feed_push, subscription.feed_url, body, dict(request.headers))
+    return {"accepted": True}
+
+
 @router.post("/refresh")
 async def trigger_manual_refresh(
     background_tasks: BackgroundTasks,
@@ -234,6 +318,9 @@ async def trigger_manual_refresh(
     # Check refresh status for each topic
     refresh_results = []
     
+    # Topics refreshed by this request share feed downloads
+    feed_cycle = FeedFetchCycle()
+    
     for topic in topics:
         can_refresh, reason, status = can_refresh_topic(topic, today, db)
         
@@ -260,14 +347,14 @@ async def trigger_manual_refresh(
                 })
         else:
             # Schedule refresh in background
-            def refresh_task(topic_name: str, date_str: str):
+            def refresh_task(topic_name: str, date_str: str, cycle: FeedFetchCycle):
                 db_session = SessionLocal()
                 try:
-                    refresh_topic_with_lock(topic_name, date_str, db_session)
+                    refresh_topic_with_lock(topic_name, date_str, db_session, feed_cycle=cycle)
                 finally:
                     db_session.close()
             
-            background_tasks.add_task(refresh_task, topic, today)
+            background_tasks.add_task(refresh_task, topic, today, feed_cycle)
             refresh_results.append({
                 "topic": topic,
                 "status": "refreshing",
@@ -14,6 +14,7 @@ from models import (
     User
 )
 from auth import get_current_active_user
+from feed_registry import get_feed_registry, get_or_create_feed
 
 router = APIRouter(prefix="/api/subscriptions", tags=["Subscriptions"])
 
@@ -168,16 +169,32 @@ async def create_custom_rss_feed(
             detail="Invalid URL format. URL must start with http:// or https://"
         )
     
+    # Feeds are shared between users (one row per normalized URL)
+    feed = get_or_create_feed(db, feed_data.feed_url)
+    
+    existing = db.query(CustomRSSFeed).filter(
+        CustomRSSFeed.user_id == current_user.id,
+        CustomRSSFeed.topic == feed_data.topic,
+        CustomRSSFeed.feed_id == feed.id
+    ).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This RSS feed is already added under this topic"
+        )
+    
     # Create custom RSS feed
     custom_feed = CustomRSSFeed(
         user_id=current_user.id,
         topic=feed_data.topic,
         feed_url=feed_data.feed_url,
+        feed_id=feed.id,
         is_active=True
     )
     db.add(custom_feed)
     db.commit()
     db.refresh(custom_feed)
+    get_feed_registry().invalidate()
     
     return custom_feed
 
@@ -209,6 +226,8 @@ async def update_custom_rss_feed(
     
     db.commit()
     db.refresh(custom_feed)
+    if feed_data.is_active is not None:
+        get_feed_registry().invalidate()
     
     return custom_feed
 
@@ -233,5 +252,6 @@ async def delete_custom_rss_feed(
     
     db.delete(custom_feed)
     db.commit()
+    get_feed_registry().invalidate()
     
     return None
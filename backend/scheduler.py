@@ -3,9 +3,22 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy import or_
 from database import SessionLocal, settings
 from models import User, Subscription, NewsCache, SystemLog, TopicRefreshStatus, CustomRSSFeed
 from news_fetcher import NewsFetcher, deduplicate_articles
+from feed_cycle import FeedFetchCycle
+from feed_registry import get_feed_registry
+from news_api_client import get_news_api_client
+from dedup import article_fingerprint, fingerprint_from_hex
+from url_utils import canonicalize_url
+from feed_poller import get_due_feeds, schedule_next_poll
+from feed_state import FETCH_OK, commit_feed_validators
+from image_cache import enrich_article_images
+from article_extractor import extract_article_texts
+from topic_index import get_topic_index
+from websub import get_push_feeds, parse_push, sync_subscriptions, websub_enabled
+from concurrent.futures import ThreadPoolExecutor
 from summarizer import get_summarizer
 import logging
 import smtplib
@@ -13,6 +26,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import uuid
 import pytz
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +34,14 @@ logger = logging.getLogger(__name__)
 # Initialize scheduler
 scheduler = BackgroundScheduler(timezone=settings.TIMEZONE)
 
+# Feed snippets are stored up to this many characters (extracted bodies up to ARTICLE_TEXT_MAX_CHARS)
+RAW_SNIPPET_CHARS = 1000
+
+# Roast generation started from the dashboard: news id -> time of the last attempt
+ROAST_RETRY_COOLDOWN = timedelta(minutes=10)
+_roast_attempts = {}
+_roast_attempts_lock = threading.Lock()
+
 
 def get_current_date_in_timezone() -> str:
     """获取配置时区的当前日期（YYYY-MM-DD格式）"""
@@ -27,7 +49,13 @@ def get_current_date_in_timezone() -> str:
     return datetime.now(tz).date().strftime("%Y-%m-%d")
 
 
-def update_news_for_topic(topic: str, date_str: str, db: Session, lock_id: str = None) -> dict:
+def update_news_for_topic(
+    topic: str,
+    date_str: str,
+    db: Session,
+    lock_id: str = None,
+    feed_cycle: FeedFetchCycle = None
+) -> dict:
     """Update news for a specific topic (optimized: one topic refresh instead of per-user)
     
     Args:
@@ -35,29 +63,14 @@ def update_news_for_topic(topic: str, date_str: str, db: Session, lock_id: str =
         date_str: Date string (YYYY-MM-DD)
         db: Database session
         lock_id: Lock ID for concurrent refresh protection
+        feed_cycle: Shared feed downloads of the current refresh run (optional)
     
     Returns:
         dict: {"success": bool, "articles_count": int, "error": str}
     """
     try:
-        # Get all active custom RSS feeds for this topic (from all users)
-        custom_feeds = db.query(CustomRSSFeed).filter(
-            CustomRSSFeed.topic == topic,
-            CustomRSSFeed.is_active == True
-        ).all()
-        
-        # Convert to list of dicts for NewsFetcher
-        custom_rss_feeds = [
-            {
-                "topic": feed.topic,
-                "feed_url": feed.feed_url,
-                "is_active": feed.is_active
-            }
-            for feed in custom_feeds
-        ]
-        
-        fetcher = NewsFetcher(custom_rss_feeds=custom_rss_feeds)
-        summarizer = get_summarizer()
+        # Default + custom feeds come from the prebuilt feed registry
+        fetcher = NewsFetcher(feed_cycle=feed_cycle)
         
         logger.info(f"Fetching news for topic: {topic} (date: {date_str})")
         
@@ -74,87 +87,14 @@ def update_news_for_topic(topic: str, date_str: str, db: Session, lock_id: str =
         # Limit to 16 articles
         articles = articles[:16]
         
-        updated_count = 0
-        created_count = 0
+        created_count = ingest_articles(topic, articles, date_str, db)
         
-        # Process articles one by one and save immediately
-        for article in articles:
-            try:
-                # For RSS articles, check by entry_id first (before LLM processing)
-                entry_id = article.get("entry_id")
-                existing = None
-                
-                if entry_id:
-                    # Check if article already exists by entry_id (for RSS feeds)
-                    existing = db.query(NewsCache).filter(
-                        NewsCache.entry_id == entry_id
-                    ).first()
-                else:
-                    # For non-RSS articles (GNews, NewsData), check by URL + date + topic
-                    existing = db.query(NewsCache).filter(
-                        NewsCache.url == article["url"],
-                        NewsCache.date == date_str,
-                        NewsCache.topic == topic
-                    ).first()
-                
-                # If already exists, skip LLM processing
-                if existing:
-                    logger.debug(f"Article already exists, skipping LLM processing: {article.get('title', 'Unknown')[:50]}...")
-                    continue
-                
-                # Only process with LLM if article doesn't exist
-                # Normal summary
-                summary_normal = summarizer.generate_summary(
-                    article["title"],
-                    article["content"],
-                    roast_mode=False
-                )
-                
-                # Roast mode summary
-                summary_roast = summarizer.generate_summary(
-                    article["title"],
-                    article["content"],
-                    roast_mode=True
-                )
-                
-                # Evaluate relevance score
-                relevance_score = summarizer.evaluate_relevance(
-                    topic,
-                    article["title"],
-                    article.get("content", "")
-                )
-                
-                # Create new cache entry
-                news_cache = NewsCache(
-                    topic=topic,
-                    title=article["title"],
-                    summary=summary_normal,
-                    summary_roast=summary_roast,
-                    url=article["url"],
-                    source=article.get("source"),
-                    image_url=article.get("image_url"),
-                    published_at=article.get("published_at"),
-                    date=date_str,
-                    relevance_score=relevance_score,
-                    raw_content=article.get("content", "")[:1000],  # Truncate
-                    entry_id=entry_id  # Store entry_id for RSS articles
-                )
-                db.add(news_cache)
-                created_count += 1
-                
-                # Commit after each article to save immediately
-                db.commit()
-                logger.debug(f"Saved article '{article.get('title', 'Unknown')[:50]}...' for topic {topic}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing article '{article.get('title', 'Unknown')}' for topic {topic}: {str(e)}")
-                db.rollback()  # Rollback on error
-                continue
+        # The RSS entries are stored now, later refreshes may get 304s for these feeds
+        commit_feed_validators(fetcher.used_feeds)
         
-        total_count = updated_count + created_count
-        logger.info(f"Updated {total_count} articles for topic: {topic} (created: {created_count}, updated: {updated_count})")
+        logger.info(f"Updated {created_count} articles for topic: {topic} (created: {created_count})")
         
-        return {"success": True, "articles_count": total_count, "error": None}
+        return {"success": True, "articles_count": created_count, "error": None}
         
     except Exception as e:
         logger.error(f"Error updating news for topic {topic}: {str(e)}")
@@ -162,6 +102,215 @@ def update_news_for_topic(topic: str, date_str: str, db: Session, lock_id: str =
         return {"success": False, "articles_count": 0, "error": str(e)}
 
 
+def get_recent_fingerprints(topic: str, db: Session) -> list:
+    """SimHash fingerprints of the topic's recently cached articles"""
+    since = datetime.utcnow() - timedelta(days=settings.NEAR_DUPLICATE_LOOKBACK_DAYS)
+    rows = db.query(NewsCache.simhash, NewsCache.title, NewsCache.raw_content).filter(
+        NewsCache.topic == topic,
+        NewsCache.fetched_at >= since
+    ).all()
+    
+    fingerprints = []
+    for simhash, title, raw_content in rows:
+        # Rows stored before fingerprints existed are hashed on the fly
+        fingerprint = fingerprint_from_hex(simhash) if simhash else article_fingerprint(title, raw_content)
+        if fingerprint is not None:
+            fingerprints.append(fingerprint)
+    return fingerprints
+
+
+def topic_has_roast_subscriber(topic: str, db: Session) -> bool:
+    """Whether any active subscription or custom RSS feed of the topic has roast_mode enabled"""
+    subscription = db.query(Subscription.id).filter(
+        Subscription.topic == topic,
+        Subscription.is_active == True,
+        Subscription.roast_mode == True
+    ).first()
+    if subscription:
+        return True
+    custom_feed = db.query(CustomRSSFeed.id).filter(
+        CustomRSSFeed.topic == topic,
+        CustomRSSFeed.is_active == True,
+        CustomRSSFeed.roast_mode == True
+    ).first()
+    return custom_feed is not None
+
+
+def ensure_roast_summaries(news_items: list, db: Session) -> int:
+    """Generate and save missing roast summaries of cached news (on first request)
+    
+    Returns:
+        int: Number of roast summaries generated
+    """
+    missing = [item for item in news_items if not item.summary_roast]
+    if not missing:
+        return 0
+    
+    summarizer = get_summarizer()
+    summaries = summarizer.summarize_many(
+        # Stored text longer than a snippet is the extracted article body
+        [
+            {"title": item.title, "content": item.raw_content or "", "full_text": len(item.raw_content or "") > RAW_SNIPPET_CHARS}
+            for item in missing
+        ],
+        roast_mode=True
+    )
+    generated = 0
+    try:
+        for item, summary in zip(missing, summaries):
+            # Fallback summaries are not saved, the next request tries the LLM again
+            if summary and not summarizer.is_fallback_summary(item.title, item.raw_content or "", True, summary):
+                item.summary_roast = summary
+                generated += 1
+        db.commit()
+        logger.info(f"Generated {generated}/{len(missing)} roast summaries on demand")
+    except Exception as e:
+        logger.error(f"Failed to save roast summaries: {str(e)}")
+        db.rollback()
+    return generated
+
+
+def claim_roast_generation(news_ids: list) -> list:
+    """News ids that may start roast generation now (marks them as attempted)
+    
+    Ids attempted within ROAST_RETRY_COOLDOWN are left out, so dashboard
+    requests don't queue the same LLM calls while one is running or after it
+    failed.
+    """
+    now = datetime.utcnow()
+    with _roast_attempts_lock:
+        for news_id, attempted_at in list(_roast_attempts.items()):
+            if now - attempted_at >= ROAST_RETRY_COOLDOWN:
+                del _roast_attempts[news_id]
+        claimed = [news_id for news_id in dict.fromkeys(news_ids) if news_id not in _roast_attempts]
+        for news_id in claimed:
+            _roast_attempts[news_id] = now
+    return claimed
+
+
+def generate_roast_summaries(news_ids: list):
+    """Background task: generate missing roast summaries of cached news"""
+    db = SessionLocal()
+    try:
+        news_items = db.query(NewsCache).filter(NewsCache.id.in_(news_ids)).all()
+        ensure_roast_summaries(news_items, db)
+    except Exception as e:
+        logger.error(f"Background roast generation failed: {str(e)}")
+    finally:
+        db.close()
+
+
+def ingest_articles(topic: str, articles: list, date_str: str, db: Session) -> int:
+    """Summarize and store new articles for a topic
+    
+    Articles already in the cache, and near-duplicates of the topic's recent
+    articles, are skipped before any LLM call. Roast summaries are only
+    generated here when the topic has a roast subscriber, otherwise on first
+    request (see ensure_roast_summaries).
+    
+    Returns:
+        int: Number of articles created
+    """
+    summarizer = get_summarizer()
+    created_count = 0
+    
+    articles = deduplicate_articles(articles, recent_fingerprints=get_recent_fingerprints(topic, db))
+    
+    # Skip articles that are already cached before any LLM call
+    new_articles = []
+    for article in articles:
+        try:
+            # For RSS articles, check by entry_id first
+            entry_id = article.get("entry_id")
+            canonical_url = article.get("canonical_url") or canonicalize_url(article["url"])
+            existing = None
+            
+            if entry_id:
+                # Check if article already exists by entry_id (for RSS feeds shared by several topics: per topic)
+                existing = db.query(NewsCache).filter(
+                    NewsCache.entry_id == entry_id,
+                    NewsCache.topic == topic
+                ).first()
+            
+            if not existing:
+                # Same article from another feed/API (GNews, NewsData): check by canonical URL + date + topic
+                # (raw url kept for rows cached before canonical_url existed)
+                existing = db.query(NewsCache).filter(
+                    or_(NewsCache.canonical_url == canonical_url, NewsCache.url == article["url"]),
+                    NewsCache.date == date_str,
+                    NewsCache.topic == topic
+                ).first()
+            
+            if existing:
+                logger.debug(f"Article already exists, skipping LLM processing: {article.get('title', 'Unknown')[:50]}...")
+                continue
+            
+            article["canonical_url"] = canonical_url
+            new_articles.append(article)
+        except Exception as e:
+            logger.error(f"Error checking article '{article.get('title', 'Unknown')}' for topic {topic}: {str(e)}")
+            continue
+    
+    if not new_articles:
+        return 0
+    
+    # Thumbnails (og:image) are downloaded concurrently and served from the local image proxy
+    enrich_article_images(new_articles)
+    
+    # Optional: give the LLM the article body instead of the feed snippet
+    extract_article_texts(new_articles)
+    
+    # Full text when extraction is enabled, otherwise the feed snippet
+    llm_inputs = [
+        {
+            "title": article["title"],
+            "content": article.get("full_text") or article.get("content", ""),
+            "full_text": bool(article.get("full_text"))
+        }
+        for article in new_articles
+    ]
+    
+    # Summary, roast summary and relevance come back together, LLM_BATCH_SIZE articles per request
+    include_roast = topic_has_roast_subscriber(topic, db)
+    analyses = summarizer.analyze_many(topic, llm_inputs, include_roast=include_roast)
+    
+    # Save each article immediately
+    for article, llm_input, analysis in zip(new_articles, llm_inputs, analyses):
+        try:
+            content = llm_input["content"]
+            
+            # Create new cache entry
+            news_cache = NewsCache(
+                topic=topic,
+                title=article["title"],
+                summary=analysis["summary"],
+                summary_roast=analysis.get("summary_roast"),
+                url=article["url"],
+                canonical_url=article["canonical_url"],
+                source=article.get("source"),
+                image_url=article.get("image_url"),
+                published_at=article.get("published_at"),
+                date=date_str,
+                relevance_score=analysis["relevance_score"],
+                raw_content=content[:settings.ARTICLE_TEXT_MAX_CHARS if llm_input["full_text"] else RAW_SNIPPET_CHARS],  # Truncate
+                entry_id=article.get("entry_id"),  # Store entry_id for RSS articles
+                simhash=article.get("simhash")
+            )
+            db.add(news_cache)
+            created_count += 1
+            
+            # Commit after each article to save immediately
+            db.commit()
+            logger.debug(f"Saved article '{article.get('title', 'Unknown')[:50]}...' for topic {topic}")
+                
+        except Exception as e:
+            logger.error(f"Error processing article '{article.get('title', 'Unknown')}' for topic {topic}: {str(e)}")
+            db.rollback()  # Rollback on error
+            continue
+    
+    return created_count
+
+
 def get_or_create_refresh_status(topic: str, date_str: str, db: Session) -> TopicRefreshStatus:
     """Get or create refresh status for a topic+date"""
     status = db.query(TopicRefreshStatus).filter(
@@ -240,9 +389,12 @@ def mark_refreshed(topic: str, date_str: str, db: Session):
     db.commit()
 
 
-def refresh_topic_with_lock(topic: str, date_str: str, db: Session) -> dict:
+def refresh_topic_with_lock(topic: str, date_str: str, db: Session, feed_cycle: FeedFetchCycle = None) -> dict:
     """Refresh a topic with lock protection
     
+    Pass the same feed_cycle when refreshing several topics in one run so that
+    feeds shared between topics are downloaded only once.
+    
     Returns:
         dict: {"success": bool, "articles_count": int, "skipped": bool, "reason": str}
     """
@@ -272,7 +424,7 @@ def refresh_topic_with_lock(topic: str, date_str: str, db: Session) -> dict:
         mark_refreshing(topic, date_str, lock_id, db)
         
         # Refresh news
-        result = update_news_for_topic(topic, date_str, db, lock_id)
+        result = update_news_for_topic(topic, date_str, db, lock_id, feed_cycle=feed_cycle)
         
         # Mark as refreshed
         mark_refreshed(topic, date_str, db)
@@ -333,10 +485,11 @@ def update_news_for_user(user_id: int, db: Session):
             return
         
         today = get_current_date_in_timezone()
+        feed_cycle = FeedFetchCycle()
         
         # Refresh each topic (will use lock protection)
         for topic in topics:
-            refresh_topic_with_lock(topic, today, db)
+            refresh_topic_with_lock(topic, today, db, feed_cycle=feed_cycle)
         
     except Exception as e:
         logger.error(f"Error updating news for user {user_id}: {str(e)}")
@@ -383,12 +536,17 @@ def daily_news_update():
         
         today = get_current_date_in_timezone()
         
+        # Fetch API results for many topics with a few OR queries (saves daily quota)
+        api_requests = get_news_api_client().prefetch(sorted(all_topics), max_articles=16)
+        
         # Refresh each topic (will handle locks and duplicates)
+        # Feeds shared by several topics are downloaded once for the whole run
+        feed_cycle = FeedFetchCycle()
         refreshed_topics = 0
         skipped_topics = 0
         
         for topic in all_topics:
-            result = refresh_topic_with_lock(topic, today, db)
+            result = refresh_topic_with_lock(topic, today, db, feed_cycle=feed_cycle)
             if result["skipped"]:
                 skipped_topics += 1
             else:
@@ -403,6 +561,8 @@ def daily_news_update():
                 "topics_count": len(all_topics),
                 "refreshed_topics": refreshed_topics,
                 "skipped_topics": skipped_topics,
+                **feed_cycle.stats(),
+                "api_requests": api_requests,
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
@@ -420,6 +580,79 @@ def daily_news_update():
         db.close()
 
 
+def get_feed_topics(db: Session) -> dict:
+    """Map every RSS feed URL to the subscribed topics that reference it"""
+    subscribed_topics = {
+        row[0] for row in db.query(Subscription.topic).join(User).filter(
+            Subscription.is_active == True,
+            User.is_active == True
+        ).distinct().all()
+    }
+    subscribed_topics.update(
+        row[0] for row in db.query(CustomRSSFeed.topic).join(User).filter(
+            CustomRSSFeed.is_active == True,
+            User.is_active == True
+        ).distinct().all()
+    )
+    
+    feeds = get_feed_registry().snapshot()
+    feed_topics = {}
+    for topic in subscribed_topics:
+        for feed_url in feeds.feeds_for(topic):
+            feed_topics.setdefault(feed_url, []).append(topic)
+    return feed_topics
+
+
+def poll_due_feeds():
+    """Adaptive feed polling task - fetch feeds whose learned poll interval has elapsed
+    
+    Each feed is polled about as often as it publishes (bounded by
+    FEED_POLL_MIN_MINUTES / FEED_POLL_MAX_MINUTES), and new entries are ingested
+    for every subscribed topic that references the feed.
+    """
+    db = SessionLocal()
+    try:
+        feed_topics = get_feed_topics(db)
+        now = datetime.utcnow()
+        # Feeds with a live WebSub subscription push their entries, no need to poll
+        push_feeds = get_push_feeds(db) if websub_enabled() else set()
+        polled_feeds = [feed_url for feed_url in feed_topics if feed_url not in push_feeds]
+        due_feeds = sorted(get_due_feeds(polled_feeds, now))
+        
+        if not due_feeds:
+            return
+        
+        logger.info(f"Polling {len(due_feeds)} due feeds")
+        fetcher = NewsFetcher()
+        
+        with ThreadPoolExecutor(max_workers=max(1, settings.RSS_FETCH_CONCURRENCY), thread_name_prefix="feed-poll") as executor:
+            results = list(executor.map(lambda url: fetcher.fetch_feed(url, max_articles=16), due_feeds))
+        
+        today = get_current_date_in_timezone()
+        created_total = 0
+        
+        for feed_url, (status, articles) in zip(due_feeds, results):
+            interval = schedule_next_poll(feed_url, status, articles, now)
+            logger.debug(f"Next poll of {feed_url} in {interval} minutes")
+            
+            # Replayed entries of a 304 were ingested when they were first fetched
+            if status != FETCH_OK or not articles:
+                continue
+            
+            for topic in feed_topics[feed_url]:
+                # Each topic gets its own copy (ingestion adds keys to the articles)
+                created_total += ingest_articles(topic, [dict(article) for article in articles], today, db)
+            commit_feed_validators([feed_url])
+        
+        logger.info(f"Feed polling completed: {len(due_feeds)} feeds polled, {created_total} new articles")
+        
+    except Exception as e:
+        logger.error(f"Feed polling failed: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 def send_scheduled_emails():
     """定时邮件任务 - 检查所有用户并发送邮件（根据每个用户的配置）
     
@@ -610,10 +843,13 @@ def build_email_digest(user: User, subscriptions: list, date_str: str, db: Sessi
         if not news_items:
             continue
         
+        if sub.roast_mode:
+            ensure_roast_summaries(news_items, db)
+        
         html += f"\n<h2>{sub.topic}</h2>\n"
         
         for item in news_items:
-            summary = item.summary_roast if sub.roast_mode else item.summary
+            summary = item.summary_roast if sub.roast_mode and item.summary_roast else item.summary
             html += f"""
             <div class="news-item">
                 <div class="news-title">{item.title}</div>
@@ -720,6 +956,45 @@ def send_email(to_email: str, subject: str, html_body: str):
         raise ValueError(error_msg)
 
 
+def ingest_feed_push(feed_url: str, body: bytes, headers: dict):
+    """Ingest entries a WebSub hub pushed for a feed into every subscribed topic that references it
+    
+    Entries are stored once per topic (news_cache is unique on topic + entry_id).
+    """
+    db = SessionLocal()
+    try:
+        articles = parse_push(feed_url, body, headers)
+        if not articles:
+            return
+        get_topic_index().add_articles(articles)
+        
+        today = get_current_date_in_timezone()
+        created_total = 0
+        for topic in get_feed_topics(db).get(feed_url, []):
+            # Each topic gets its own copy (ingestion adds keys to the articles)
+            created_total += ingest_articles(topic, [dict(article) for article in articles], today, db)
+        logger.info(f"WebSub push for {feed_url}: {len(articles)} entries, {created_total} new articles")
+    except Exception as e:
+        logger.error(f"WebSub push ingestion failed for {feed_url}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def sync_websub_subscriptions():
+    """WebSub task - subscribe to discovered hubs and renew leases before they expire"""
+    db = SessionLocal()
+    try:
+        stats = sync_subscriptions(db, set(get_feed_topics(db).keys()))
+        if any(stats.values()):
+            logger.info(f"WebSub subscriptions synced: {stats}")
+    except Exception as e:
+        logger.error(f"WebSub subscription sync failed: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 def start_scheduler():
     """Start the background scheduler - checks user schedules every hour"""
     try:
@@ -747,6 +1022,34 @@ def start_scheduler():
             replace_existing=True
         )
         
+        # Adaptive per-feed polling (each feed polled at its own learned interval)
+        if settings.FEED_POLLING_ENABLED:
+            scheduler.add_job(
+                poll_due_feeds,
+                IntervalTrigger(
+                    minutes=settings.FEED_POLL_TICK_MINUTES,
+                    timezone=settings.TIMEZONE
+                ),
+                id='poll_due_feeds',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
+        # WebSub: (re)subscribe feeds that advertise a hub
+        if websub_enabled():
+            scheduler.add_job(
+                sync_websub_subscriptions,
+                IntervalTrigger(
+                    minutes=settings.WEBSUB_RENEW_MINUTES,
+                    timezone=settings.TIMEZONE
+                ),
+                id='sync_websub_subscriptions',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
         scheduler.start()
         logger.info(
             f"Scheduler started (optimized) - News update at {settings.DAILY_UPDATE_HOUR}:{settings.DAILY_UPDATE_MINUTE:02d}, "
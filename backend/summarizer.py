@@ -1,8 +1,18 @@
 import dashscope
+import json
 import requests
 import re
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from database import settings
+from http_client import get_http_session, http_timeout
+from llm_executor import get_llm_executor
+from llm_cache import llm_cache_key, get_cached_outputs, store_outputs
+from http_fixtures import (
+    fixture_call,
+    get_fixture_httpx_client,
+    serialize_dashscope_response,
+    deserialize_dashscope_response
+)
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -20,9 +30,14 @@ def get_nvidia_client():
     if _nvidia_client is None and settings.NVIDIA_API_KEY:
         try:
             from openai import OpenAI
+            client_options = {}
+            fixture_client = get_fixture_httpx_client()
+            if fixture_client is not None:
+                client_options["http_client"] = fixture_client
             _nvidia_client = OpenAI(
                 base_url="https://integrate.api.nvidia.com/v1",
-                api_key=settings.NVIDIA_API_KEY
+                api_key=settings.NVIDIA_API_KEY,
+                **client_options
             )
         except ImportError:
             logger.error("OpenAI library not installed. Please run: pip install openai")
@@ -30,6 +45,92 @@ def get_nvidia_client():
     return _nvidia_client
 
 
+# Bump a mode's version when its prompts change, so cached outputs of the old prompt are not reused
+PROMPT_VERSIONS = {"summary": 1, "roast": 1, "relevance": 1}
+
+# Feed snippet characters shown in single-article relevance prompts
+RELEVANCE_SNIPPET_CHARS = 500
+
+_NORMAL_SYSTEM_PROMPT = "你是一个专业的新闻摘要助手，擅长用简洁、客观的语言总结新闻要点。"
+_NORMAL_REQUIREMENTS = """1. 客观中性，不带个人情感
+2. 准确提炼关键信息
+3. 语言简洁专业
+4. 每条不超过50字"""
+_ROAST_SYSTEM_PROMPT = "你是聪明、幽默、有点毒舌的新闻评论员，擅长用俏皮、搞笑、略带吐槽的语气总结新闻。"
+_ROAST_REQUIREMENTS = """1. 语气幽默、俏皮，可以适当调侃
+2. 抓住新闻核心要点
+3. 加入一些网络流行语或段子风格
+4. 每条保持简洁，不超过60字"""
+
+
+def prompt_content(content: str, full_text: bool, snippet_chars: Optional[int] = None) -> str:
+    """Content as shown to the LLM
+    
+    An extracted article body gets its own, larger budget (LLM_FULL_TEXT_CHARS):
+    its first few hundred characters are mostly the lede the feed snippet
+    already had. Feed snippets are cut to snippet_chars (None = as they are).
+    """
+    content = content or ""
+    if full_text:
+        return content[:settings.LLM_FULL_TEXT_CHARS]
+    return content if snippet_chars is None else content[:snippet_chars]
+
+
+def format_articles_for_prompt(articles: List[Dict]) -> str:
+    """Numbered article list for batch prompts (see prompt_content for the content budget)"""
+    blocks = []
+    for index, article in enumerate(articles):
+        content = prompt_content(article.get("content"), article.get("full_text", False), settings.LLM_BATCH_CONTENT_CHARS)
+        blocks.append(f"[{index}]\n新闻标题：{article.get('title', '')}\n新闻内容：{content}")
+    return "\n\n".join(blocks)
+
+
+def validate_analysis(value) -> Dict:
+    """Valid fields of one article's analysis ({"summary": str, "roast": str, "relevance": 0-1})
+    
+    Returns the usable fields under their NewsCache names (summary,
+    summary_roast, relevance_score); invalid or missing fields are left out.
+    """
+    if not isinstance(value, dict):
+        return {}
+    
+    result = {}
+    for field, column in (("summary", "summary"), ("roast", "summary_roast")):
+        text = value.get(field)
+        if isinstance(text, str) and text.strip():
+            result[column] = text.strip()
+    
+    relevance = value.get("relevance")
+    if isinstance(relevance, str):
+        try:
+            relevance = float(relevance.strip())
+        except ValueError:
+            relevance = None
+    if isinstance(relevance, (int, float)) and not isinstance(relevance, bool) and 0.0 <= relevance <= 1.0:
+        result["relevance_score"] = float(relevance)
+    return result
+
+
+def parse_json_reply(reply: str):
+    """Parse a JSON object out of an LLM reply (tolerates code fences and surrounding text)"""
+    text = reply.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return json.loads(text[start:end + 1])
+        except ValueError:
+            pass
+    return None
+
+
 class NewsSummarizer:
     """Generate news summaries using Alibaba Qwen LLM or Local Ollama"""
     
@@ -60,7 +161,7 @@ class NewsSummarizer:
         try:
             # 检查Ollama服务是否运行
             health_url = f"{self.base_url}/api/tags"
-            response = requests.get(health_url, timeout=5)
+            response = get_http_session().get(health_url, timeout=http_timeout(5))
             if response.status_code == 200:
                 models = response.json().get("models", [])
                 model_names = [m.get("name", "") for m in models]
@@ -86,7 +187,8 @@ class NewsSummarizer:
         self, 
         title: str, 
         content: str, 
-        roast_mode: bool = False
+        roast_mode: bool = False,
+        full_text: bool = False
     ) -> str:
         """
         Generate a concise 1-2 sentence summary of news article
@@ -95,19 +197,72 @@ class NewsSummarizer:
             title: News title
             content: News content/description
             roast_mode: If True, generate humorous/roast-style summary
+            full_text: content is the extracted article body (see prompt_content)
         
         Returns:
             Summary string
         """
-        if self.provider == "dashscope":
-            return self._generate_dashscope(title, content, roast_mode)
-        elif self.provider == "ollama":
-            return self._generate_ollama(title, content, roast_mode)
-        elif self.provider == "nvidia":
-            return self._generate_nvidia(title, content, roast_mode)
-        else:
+        if self.provider not in ("dashscope", "ollama", "nvidia"):
             logger.warning(f"Unknown LLM provider: {self.provider}, using fallback")
             return self._fallback_summary(title, content, roast_mode)
+        
+        mode = "roast" if roast_mode else "summary"
+        key = self._cache_key(mode, title, content)
+        cached = get_cached_outputs([key]).get(key)
+        if cached is not None:
+            return cached
+        
+        shown = prompt_content(content, full_text)
+        with get_llm_executor().slot(self.provider):
+            if self.provider == "dashscope":
+                summary = self._generate_dashscope(title, shown, roast_mode)
+            elif self.provider == "ollama":
+                summary = self._generate_ollama(title, shown, roast_mode)
+            else:
+                summary = self._generate_nvidia(title, shown, roast_mode)
+        
+        # Fallback summaries are not cached, the next run tries the LLM again
+        if summary and not self.is_fallback_summary(title, content, roast_mode, summary):
+            store_outputs([(key, mode, summary)])
+        return summary
+    
+    def _cache_key(self, mode: str, title: str, content: str, topic: Optional[str] = None) -> str:
+        """LLM cache key of one output (relevance scores also depend on the topic)"""
+        return llm_cache_key(f"{self.provider}:{self.model}", mode, PROMPT_VERSIONS[mode], title, content, topic)
+    
+    def _cached_fields(self, topic: Optional[str], articles: List[Dict]) -> List[Dict]:
+        """Cached summary / summary_roast / relevance_score of each article (relevance only with a topic)"""
+        fields = [("summary", "summary", None), ("roast", "summary_roast", None)]
+        if topic is not None:
+            fields.append(("relevance", "relevance_score", topic))
+        
+        keys = [
+            {column: self._cache_key(mode, article.get("title", ""), article.get("content", ""), key_topic)
+             for mode, column, key_topic in fields}
+            for article in articles
+        ]
+        cached = get_cached_outputs(key for article_keys in keys for key in article_keys.values())
+        
+        results = []
+        for article_keys in keys:
+            found = {}
+            for column, key in article_keys.items():
+                if key in cached:
+                    found[column] = float(cached[key]) if column == "relevance_score" else cached[key]
+            results.append(found)
+        return results
+    
+    def _store_fields(self, topic: Optional[str], articles: List[Dict], results: List[Dict]):
+        """Cache the LLM-produced fields of each article"""
+        modes = {"summary": "summary", "summary_roast": "roast", "relevance_score": "relevance"}
+        entries = []
+        for article, fields in zip(articles, results):
+            for column, value in fields.items():
+                mode = modes[column]
+                key_topic = topic if mode == "relevance" else None
+                key = self._cache_key(mode, article.get("title", ""), article.get("content", ""), key_topic)
+                entries.append((key, mode, str(value)))
+        store_outputs(entries)
 
     def _generate_ollama(self, title: str, content: str, roast_mode: bool) -> str:
         """Generate summary using local Ollama model"""
@@ -123,7 +278,11 @@ class NewsSummarizer:
                 "temperature": 0.8 if roast_mode else 0.3,
             }
             
-            response = requests.post(self.api_url, json=payload, timeout=120)
+            response = get_http_session().post(
+                self.api_url,
+                json=payload,
+                timeout=http_timeout(settings.OLLAMA_TIMEOUT)
+            )
             
             if response.status_code == 200:
                 result = response.json()
@@ -156,7 +315,7 @@ class NewsSummarizer:
             )
             return self._fallback_summary(title, content, roast_mode)
         except requests.exceptions.Timeout:
-            logger.error(f"Ollama请求超时 (超过120秒)，使用备用摘要")
+            logger.error(f"Ollama请求超时 (超过{settings.OLLAMA_TIMEOUT}秒)，使用备用摘要")
             return self._fallback_summary(title, content, roast_mode)
         except requests.exceptions.RequestException as e:
             logger.error(f"Ollama请求异常: {str(e)}")
@@ -292,7 +451,7 @@ class NewsSummarizer:
         try:
             prompt = self._build_prompt(title, content, roast_mode)
             
-            response = dashscope.Generation.call(
+            response = self._call_dashscope(
                 model=self.model,
                 prompt=prompt,
                 max_tokens=150,
@@ -312,6 +471,110 @@ class NewsSummarizer:
             logger.error(f"Summary generation error: {str(e)}")
             return self._fallback_summary(title, content, roast_mode)
     
+    def _call_dashscope(self, **params):
+        """Call DashScope Generation API (recorded / replayed in HTTP fixture mode)"""
+        return fixture_call(
+            "dashscope",
+            params,
+            lambda: dashscope.Generation.call(**params),
+            serialize_dashscope_response,
+            deserialize_dashscope_response
+        )
+    
+    def _call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool = False
+    ) -> Optional[str]:
+        """Send one chat request to the configured provider, returns the reply text (None on failure)"""
+        with get_llm_executor().slot(self.provider):
+            return self._request_llm(system_prompt, user_prompt, temperature, max_tokens, json_mode)
+    
+    def _request_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool
+    ) -> Optional[str]:
+        try:
+            if self.provider == "ollama":
+                payload = {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "stream": False,
+                    "temperature": temperature,
+                }
+                if json_mode:
+                    payload["format"] = "json"
+                response = get_http_session().post(
+                    self.api_url,
+                    json=payload,
+                    timeout=http_timeout(settings.OLLAMA_TIMEOUT)
+                )
+                if response.status_code != 200:
+                    logger.error(f"Ollama API错误: HTTP {response.status_code} - {response.text[:200]}")
+                    return None
+                result = response.json()
+                if "message" in result and "content" in result["message"]:
+                    return result["message"]["content"].strip()
+                if "choices" in result and len(result["choices"]) > 0:
+                    return result["choices"][0]["message"]["content"].strip()
+                logger.error(f"Ollama响应格式异常: {result}")
+                return None
+            
+            if self.provider == "nvidia":
+                client = get_nvidia_client()
+                if not client:
+                    return None
+                response = client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=False
+                )
+                if not response.choices:
+                    return None
+                message = response.choices[0].message
+                if message and message.content:
+                    return message.content.strip()
+                # GLM reasoning mode may put the answer into reasoning_content
+                if hasattr(message, 'reasoning_content') and message.reasoning_content:
+                    return message.reasoning_content.strip()
+                return None
+            
+            if self.provider == "dashscope":
+                if not settings.DASHSCOPE_API_KEY:
+                    return None
+                response = self._call_dashscope(
+                    model=self.model,
+                    prompt=f"{system_prompt}\n\n{user_prompt}",
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=0.9
+                )
+                if response.status_code != 200:
+                    logger.error(f"DashScope API error: {response.message}")
+                    return None
+                return response.output.text.strip()
+            
+            logger.warning(f"Unknown LLM provider: {self.provider}")
+            return None
+        except Exception as e:
+            logger.error(f"LLM request error ({self.provider}): {str(e)}")
+            return None
+    
     def _build_prompt(self, title: str, content: str, roast_mode: bool) -> str:
         """Build prompt for LLM based on mode"""
         
@@ -342,7 +605,7 @@ class NewsSummarizer:
 
 摘要："""
     
-    def evaluate_relevance(self, topic: str, title: str, content: str) -> float:
+    def evaluate_relevance(self, topic: str, title: str, content: str, full_text: bool = False) -> float:
         """
         评估新闻与主题的相关性分数 (0-1)
         
@@ -350,40 +613,53 @@ class NewsSummarizer:
             topic: 主题名称
             title: 新闻标题
             content: 新闻内容
+            full_text: content 是否为抓取的正文（正文使用更大的字符预算）
             
         Returns:
             float: 相关性分数 (0-1)，默认0.5
         """
+        if self.provider not in ("nvidia", "ollama", "dashscope"):
+            logger.warning(f"Unknown LLM provider for relevance evaluation: {self.provider}")
+            return 0.5  # 默认分数
+        
+        key = self._cache_key("relevance", title, content, topic)
+        cached = get_cached_outputs([key]).get(key)
+        if cached is not None:
+            return float(cached)
+        
+        shown = prompt_content(content, full_text, RELEVANCE_SNIPPET_CHARS)
         try:
-            if self.provider == "nvidia":
-                return self._evaluate_relevance_nvidia(topic, title, content)
-            elif self.provider == "ollama":
-                return self._evaluate_relevance_ollama(topic, title, content)
-            elif self.provider == "dashscope":
-                return self._evaluate_relevance_dashscope(topic, title, content)
-            else:
-                logger.warning(f"Unknown LLM provider for relevance evaluation: {self.provider}")
-                return 0.5  # 默认分数
+            with get_llm_executor().slot(self.provider):
+                if self.provider == "nvidia":
+                    score = self._evaluate_relevance_nvidia(topic, title, shown)
+                elif self.provider == "ollama":
+                    score = self._evaluate_relevance_ollama(topic, title, shown)
+                else:
+                    score = self._evaluate_relevance_dashscope(topic, title, shown)
+            if score is None:
+                return 0.5  # 评估失败时返回默认分数（不缓存）
+            store_outputs([(key, "relevance", str(score))])
+            return score
         except Exception as e:
             logger.error(f"Error evaluating relevance: {str(e)}", exc_info=True)
             return 0.5  # 出错时返回默认分数
     
-    def _evaluate_relevance_nvidia(self, topic: str, title: str, content: str) -> float:
-        """使用NVIDIA GLM API评估相关性"""
+    def _evaluate_relevance_nvidia(self, topic: str, title: str, content: str) -> Optional[float]:
+        """使用NVIDIA GLM API评估相关性（失败时返回None）"""
         if not settings.NVIDIA_API_KEY or settings.NVIDIA_API_KEY == "":
-            return 0.5
+            return None
         
         try:
             client = get_nvidia_client()
             if not client:
-                return 0.5
+                return None
             
             system_prompt = "你是一个专业的新闻相关性评估助手，擅长评估新闻与主题的相关性。"
             user_prompt = f"""主题：{topic}
 
 新闻标题：{title}
 
-新闻内容：{content[:500]}
+新闻内容：{content}
 
 请评估这条新闻与主题"{topic}"的相关性，给出0-1之间的分数：
 - 0.9-1.0: 高度相关，核心内容完全匹配主题
@@ -421,22 +697,22 @@ class NewsSummarizer:
                     return score
                 else:
                     logger.warning(f"Could not parse relevance score from: {content_text}")
-                    return 0.5
+                    return None
             else:
-                return 0.5
+                return None
                 
         except Exception as e:
             logger.error(f"Error evaluating relevance with NVIDIA: {str(e)}")
-            return 0.5
+            return None
     
-    def _evaluate_relevance_ollama(self, topic: str, title: str, content: str) -> float:
+    def _evaluate_relevance_ollama(self, topic: str, title: str, content: str) -> Optional[float]:
         """使用Ollama评估相关性"""
         try:
             prompt = f"""主题：{topic}
 
 新闻标题：{title}
 
-新闻内容：{content[:500]}
+新闻内容：{content}
 
 请评估这条新闻与主题"{topic}"的相关性，给出0-1之间的分数（0完全不相关，1完全相关）。
 只返回一个数字，例如：0.85"""
@@ -450,7 +726,11 @@ class NewsSummarizer:
                 "temperature": 0.3,
             }
             
-            response = requests.post(self.api_url, json=payload, timeout=30)
+            response = get_http_session().post(
+                self.api_url,
+                json=payload,
+                timeout=http_timeout(settings.OLLAMA_RELEVANCE_TIMEOUT)
+            )
             
             if response.status_code == 200:
                 result = response.json()
@@ -469,30 +749,30 @@ class NewsSummarizer:
                     return score
                 else:
                     logger.warning(f"Could not parse relevance score from Ollama response: {content_text}")
-                    return 0.5
+                    return None
             else:
-                return 0.5
+                return None
                 
         except Exception as e:
             logger.error(f"Error evaluating relevance with Ollama: {str(e)}")
-            return 0.5
+            return None
     
-    def _evaluate_relevance_dashscope(self, topic: str, title: str, content: str) -> float:
+    def _evaluate_relevance_dashscope(self, topic: str, title: str, content: str) -> Optional[float]:
         """使用DashScope评估相关性"""
         if not settings.DASHSCOPE_API_KEY or settings.DASHSCOPE_API_KEY == "":
-            return 0.5
+            return None
         
         try:
             prompt = f"""主题：{topic}
 
 新闻标题：{title}
 
-新闻内容：{content[:500]}
+新闻内容：{content}
 
 请评估这条新闻与主题"{topic}"的相关性，给出0-1之间的分数（0完全不相关，1完全相关）。
 只返回一个数字，例如：0.85"""
             
-            response = dashscope.Generation.call(
+            response = self._call_dashscope(
                 model=self.model,
                 prompt=prompt,
                 max_tokens=50,
@@ -511,13 +791,17 @@ class NewsSummarizer:
                     return score
                 else:
                     logger.warning(f"Could not parse relevance score from DashScope response: {content_text}")
-                    return 0.5
+                    return None
             else:
-                return 0.5
+                return None
                 
         except Exception as e:
             logger.error(f"Error evaluating relevance with DashScope: {str(e)}")
-            return 0.5
+            return None
+    
+    def is_fallback_summary(self, title: str, content: str, roast_mode: bool, summary: str) -> bool:
+        """Whether summary is the truncated text returned when the LLM is not available"""
+        return summary == self._fallback_summary(title, content, roast_mode)
     
     def _fallback_summary(self, title: str, content: str, roast_mode: bool) -> str:
         """Fallback summary when API is not available"""
@@ -545,26 +829,213 @@ class NewsSummarizer:
         Returns:
             List of articles with added 'summary' field
         """
-        results = []
+        summaries = self.summarize_many(articles, roast_mode)
+        for article, summary in zip(articles, summaries):
+            article["summary"] = summary
+        return articles
+    
+    def summarize_many(self, articles: List[Dict], roast_mode: bool = False) -> List[str]:
+        """Summaries for several articles, LLM_BATCH_SIZE articles per request
+        
+        Cached summaries are reused. Each request asks for a JSON object keyed
+        by article index; articles whose entry is missing or unusable fall back
+        to a single-article call. Results are in input order.
+        """
+        batch_size = max(1, settings.LLM_BATCH_SIZE)
+        executor = get_llm_executor()
+        column = "summary_roast" if roast_mode else "summary"
+        summaries: List[Optional[str]] = [fields.get(column) for fields in self._cached_fields(None, articles)]
+        
+        uncached = [index for index, summary in enumerate(summaries) if summary is None]
+        if batch_size > 1 and len(uncached) > 1:
+            chunks = [uncached[start:start + batch_size] for start in range(0, len(uncached), batch_size)]
+            batch_results = executor.map(
+                self.provider,
+                lambda chunk: self._summarize_batch([articles[index] for index in chunk], roast_mode),
+                chunks
+            )
+            generated = []
+            for chunk, results in zip(chunks, batch_results):
+                for offset, summary in results.items():
+                    summaries[chunk[offset]] = summary
+                    generated.append(chunk[offset])
+            self._store_fields(
+                None,
+                [articles[index] for index in generated],
+                [{column: summaries[index]} for index in generated]
+            )
         
-        for article in articles:
+        missing = [index for index, summary in enumerate(summaries) if summary is None]
+        if missing and len(missing) < len(articles):
+            logger.info(f"Batch summary incomplete, summarizing {len(missing)} articles one by one")
+        
+        def summarize_one(index: int) -> str:
+            title = articles[index].get("title", "")
+            content = articles[index].get("content", "")
             try:
-                summary = self.generate_summary(
-                    article.get("title", ""),
-                    article.get("content", ""),
-                    roast_mode
-                )
-                article["summary"] = summary
-                results.append(article)
+                return self.generate_summary(title, content, roast_mode, articles[index].get("full_text", False))
             except Exception as e:
                 logger.error(f"Batch summarize error: {str(e)}")
-                article["summary"] = self._fallback_summary(
-                    article.get("title", ""),
-                    article.get("content", ""),
-                    roast_mode
-                )
-                results.append(article)
+                return self._fallback_summary(title, content, roast_mode)
+        
+        for index, summary in zip(missing, executor.map(self.provider, summarize_one, missing)):
+            summaries[index] = summary
+        return summaries
+    
+    def _summarize_batch(self, batch: List[Dict], roast_mode: bool) -> Dict[int, str]:
+        """One request for a batch of articles, returns {index in batch: summary} for the usable answers"""
+        system_prompt = _ROAST_SYSTEM_PROMPT if roast_mode else _NORMAL_SYSTEM_PROMPT
+        requirements = _ROAST_REQUIREMENTS if roast_mode else _NORMAL_REQUIREMENTS
+        
+        user_prompt = f"""下面有{len(batch)}条新闻，请分别用1-2句话总结每条新闻，要求：
+{requirements}
+
+{format_articles_for_prompt(batch)}
+
+只返回一个JSON对象，键为新闻编号（字符串），值为对应的摘要，例如：
+{{"0": "摘要", "1": "摘要"}}"""
+        
+        reply = self._call_llm(
+            system_prompt,
+            user_prompt,
+            temperature=0.8 if roast_mode else 0.3,
+            max_tokens=150 * len(batch) + 100,
+            json_mode=True
+        )
+        if reply is None:
+            return {}
+        
+        parsed = parse_json_reply(reply)
+        results = {}
+        if isinstance(parsed, dict):
+            for key, value in parsed.items():
+                index = int(key) if str(key).strip().isdigit() else None
+                if index is not None and 0 <= index < len(batch) and isinstance(value, str) and value.strip():
+                    results[index] = value.strip()
+        
+        if len(results) < len(batch):
+            logger.warning(f"Batch summary: {len(results)}/{len(batch)} usable answers")
+        else:
+            logger.info(f"Generated {len(results)} summaries in one request ({self.provider})")
+        return results
+    
+    def analyze_many(self, topic: str, articles: List[Dict], include_roast: bool = True) -> List[Dict]:
+        """Normal summary, roast summary and relevance score for each article
         
+        With include_roast=False the roast summary is not asked for (it is
+        generated later on demand); summary_roast is then only set when
+        already cached.
+        
+        Outputs already in the LLM cache are reused. For the rest, one request
+        per LLM_BATCH_SIZE articles returns all three as JSON (see
+        validate_analysis). Fields that are missing or invalid in the answer
+        are filled in with the dedicated single-purpose calls.
+        
+        Returns:
+            List of {"summary", "summary_roast", "relevance_score"} dicts, in input order
+        """
+        required = {"summary", "summary_roast", "relevance_score"} if include_roast else {"summary", "relevance_score"}
+        batch_size = max(1, settings.LLM_BATCH_SIZE)
+        executor = get_llm_executor()
+        results = self._cached_fields(topic, articles)
+        
+        # Articles seen under another topic only need a relevance score (filled in below)
+        uncached = [index for index, fields in enumerate(results) if not (required - {"relevance_score"}) <= fields.keys()]
+        chunks = [uncached[start:start + batch_size] for start in range(0, len(uncached), batch_size)]
+        batch_results = executor.map(
+            self.provider,
+            lambda chunk: self._analyze_batch(topic, [articles[index] for index in chunk], include_roast),
+            chunks
+        )
+        generated_articles, generated_fields = [], []
+        for chunk, analyses in zip(chunks, batch_results):
+            for offset, analysis in analyses.items():
+                new_fields = {column: value for column, value in analysis.items() if column not in results[chunk[offset]]}
+                results[chunk[offset]].update(new_fields)
+                generated_articles.append(articles[chunk[offset]])
+                generated_fields.append(new_fields)
+        self._store_fields(topic, generated_articles, generated_fields)
+        
+        def complete(index: int):
+            analysis = results[index]
+            title = articles[index].get("title", "")
+            content = articles[index].get("content", "")
+            full_text = articles[index].get("full_text", False)
+            try:
+                if "summary" not in analysis:
+                    analysis["summary"] = self.generate_summary(title, content, roast_mode=False, full_text=full_text)
+                if include_roast and "summary_roast" not in analysis:
+                    analysis["summary_roast"] = self.generate_summary(title, content, roast_mode=True, full_text=full_text)
+            except Exception as e:
+                logger.error(f"Analyze fallback error: {str(e)}")
+                analysis.setdefault("summary", self._fallback_summary(title, content, False))
+                if include_roast:
+                    analysis.setdefault("summary_roast", self._fallback_summary(title, content, True))
+            if "relevance_score" not in analysis:
+                analysis["relevance_score"] = self.evaluate_relevance(topic, title, content, full_text)
+        
+        incomplete = [index for index, analysis in enumerate(results) if not required <= analysis.keys()]
+        if incomplete:
+            logger.info(f"Analysis incomplete for {len(incomplete)}/{len(articles)} articles, filled in one by one")
+            executor.map(self.provider, complete, incomplete)
+        return results
+    
+    def _analyze_batch(self, topic: str, batch: List[Dict], include_roast: bool = True) -> Dict[int, Dict]:
+        """One request analyzing a batch of articles, returns {index in batch: valid fields}"""
+        if include_roast:
+            roast_field = f"""- roast：用1-2句话吐槽式总结这条新闻，要求：
+{_ROAST_REQUIREMENTS}
+"""
+            example = '{"0": {"summary": "摘要", "roast": "吐槽式摘要", "relevance": 0.85}}'
+            system_prompt = "你是一个专业的新闻分析助手，既能用简洁、客观的语言总结新闻，也能用幽默、俏皮的语气吐槽新闻，并能准确评估新闻与主题的相关性。"
+        else:
+            roast_field = ""
+            example = '{"0": {"summary": "摘要", "relevance": 0.85}}'
+            system_prompt = "你是一个专业的新闻分析助手，擅长用简洁、客观的语言总结新闻，并能准确评估新闻与主题的相关性。"
+        
+        user_prompt = f"""主题：{topic}
+
+下面有{len(batch)}条新闻，请对每条新闻给出：
+- summary：用1-2句话客观总结新闻核心内容，要求：
+{_NORMAL_REQUIREMENTS}
+{roast_field}- relevance：新闻与主题"{topic}"的相关性，0-1之间的数字（0完全不相关，1完全相关）
+
+{format_articles_for_prompt(batch)}
+
+只返回一个JSON对象，键为新闻编号（字符串），例如：
+{example}"""
+        
+        reply = self._call_llm(
+            system_prompt,
+            user_prompt,
+            temperature=0.6 if include_roast else 0.3,
+            max_tokens=(300 if include_roast else 180) * len(batch) + 100,
+            json_mode=True
+        )
+        if reply is None:
+            return {}
+        
+        parsed = parse_json_reply(reply)
+        # A single article may come back unwrapped
+        if len(batch) == 1 and isinstance(parsed, dict) and "summary" in parsed:
+            parsed = {"0": parsed}
+        
+        results = {}
+        if isinstance(parsed, dict):
+            for key, value in parsed.items():
+                index = int(key) if str(key).strip().isdigit() else None
+                if index is not None and 0 <= index < len(batch):
+                    analysis = validate_analysis(value)
+                    if not include_roast:
+                        analysis.pop("summary_roast", None)
+                    if analysis:
+                        results[index] = analysis
+        
+        complete = sum(1 for analysis in results.values() if len(analysis) == (3 if include_roast else 2))
+        if complete < len(batch):
+            logger.warning(f"Article analysis: {complete}/{len(batch)} complete answers")
+        else:
+            logger.info(f"Analyzed {complete} articles in one request ({self.provider})")
         return results
 
 
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic_settings")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import feed_poller
+from database import Base
+from feed_state import FETCH_ERROR, FETCH_NOT_MODIFIED, FETCH_OK
+from models import FeedState
+
+FEED_URL = "https://example.com/feed.xml"
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(feed_poller, "SessionLocal", factory)
+
+    db = factory()
+    db.add(FeedState(feed_url=FEED_URL, poll_interval_minutes=60, last_entry_at=NOW - timedelta(hours=1)))
+    db.commit()
+    db.close()
+    return factory
+
+
+def stored_interval(factory) -> int:
+    db = factory()
+    try:
+        return db.query(FeedState).filter(FeedState.feed_url == FEED_URL).one().poll_interval_minutes
+    finally:
+        db.close()
+
+
+def test_error_backs_off(session_factory):
+    interval = feed_poller.schedule_next_poll(FEED_URL, FETCH_ERROR, [], NOW)
+    assert interval == feed_poller.clamp_poll_interval(60 * feed_poller.ERROR_BACKOFF)
+    assert stored_interval(session_factory) == interval
+
+
+def test_not_modified_backs_off(session_factory):
+    # Replayed entries must not count as new ones
+    replayed = [{"published_at": NOW}]
+    interval = feed_poller.schedule_next_poll(FEED_URL, FETCH_NOT_MODIFIED, replayed, NOW)
+    assert interval == feed_poller.clamp_poll_interval(60 * feed_poller.NOT_MODIFIED_BACKOFF)
+    assert stored_interval(session_factory) == interval
+
+
+def test_new_entries_use_publish_rate(session_factory):
+    articles = [{"published_at": NOW - timedelta(minutes=30 * i)} for i in range(5)]
+    interval = feed_poller.schedule_next_poll(FEED_URL, FETCH_OK, articles, NOW)
+    assert interval == feed_poller.clamp_poll_interval(30)
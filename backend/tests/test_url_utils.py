@@ -0,0 +1,27 @@
+from url_utils import canonicalize_url, normalize_feed_url
+
+
+def test_strips_tracking_params_and_known_amp_forms():
+    assert canonicalize_url("http://www.example.com/news/story/amp?utm_source=x&fbclid=1") == \
+        "https://example.com/news/story"
+    assert canonicalize_url("https://example.com/amp/news/story") == "https://example.com/news/story"
+    assert canonicalize_url("https://example.com/news/story.amp.html") == "https://example.com/news/story.html"
+    assert canonicalize_url("https://amp.example.com/news/story") == "https://example.com/news/story"
+
+
+def test_keeps_amp_segment_in_the_middle_of_the_path():
+    assert canonicalize_url("https://reddit.com/r/amp/comments/xx") == "https://reddit.com/r/amp/comments/xx"
+
+
+def test_keeps_path_that_is_only_amp():
+    assert canonicalize_url("https://example.com/amp") == "https://example.com/amp"
+
+
+def test_keeps_generic_params_that_identify_the_article():
+    assert canonicalize_url("https://example.com/article?ref=12345") == "https://example.com/article?ref=12345"
+    assert canonicalize_url("https://example.com/article?ref=1") != canonicalize_url("https://example.com/article?ref=2")
+
+
+def test_malformed_port_is_left_alone():
+    assert canonicalize_url("http://example.com:abc/x") == "http://example.com:abc/x"
+    assert normalize_feed_url("http://example.com:abc/feed") == "http://example.com:abc/feed"
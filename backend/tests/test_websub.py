@@ -0,0 +1,48 @@
+import hashlib
+import hmac
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("feedparser")
+
+from models import WebSubSubscription
+from websub import STATE_PENDING, STATE_UNSUBSCRIBED, STATE_VERIFIED, accept_push
+
+BODY = b"<feed xmlns='http://www.w3.org/2005/Atom'></feed>"
+
+
+def subscription(state: str, secret: str = "s3cret") -> WebSubSubscription:
+    return WebSubSubscription(
+        feed_url="https://example.com/feed.xml",
+        topic_url="https://example.com/feed.xml",
+        hub_url="https://hub.example.com/",
+        callback_token="token",
+        secret=secret,
+        state=state
+    )
+
+
+def signature(secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode("utf-8"), BODY, hashlib.sha256).hexdigest()
+
+
+def test_verified_subscription_with_valid_signature_is_accepted():
+    assert accept_push(subscription(STATE_VERIFIED), BODY, signature("s3cret"))
+
+
+def test_push_to_pending_subscription_is_ignored():
+    assert not accept_push(subscription(STATE_PENDING), BODY, signature("s3cret"))
+
+
+def test_push_to_removed_subscription_is_ignored():
+    assert not accept_push(subscription(STATE_UNSUBSCRIBED), BODY, signature("s3cret"))
+
+
+def test_push_without_secret_is_ignored():
+    assert not accept_push(subscription(STATE_VERIFIED, secret=""), BODY, signature(""))
+
+
+def test_push_with_bad_signature_is_ignored():
+    assert not accept_push(subscription(STATE_VERIFIED), BODY, signature("other"))
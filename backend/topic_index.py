@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from math import log
+from typing import Dict, List
+from database import SessionLocal, settings
+from models import NewsCache
+from dedup import extract_features
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TopicIndex:
+    """In-memory inverted index over recently fetched feed entries
+    
+    Free-text topics (topics without their own feeds) are answered with a BM25
+    lookup against entries every feed fetch has already added, instead of
+    downloading every feed again. Tokens are latin words and CJK character
+    bigrams, the same features the near-duplicate fingerprints use. An entry
+    only matches when it contains at least min_coverage of the query's
+    distinct tokens, so one shared common word is not enough.
+    """
+    
+    def __init__(
+        self,
+        max_docs: int,
+        max_age_seconds: int,
+        min_coverage: float = 0.5,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        self.max_docs = max_docs
+        self.max_age_seconds = max_age_seconds
+        self.min_coverage = min_coverage
+        self.k1 = k1
+        self.b = b
+        # doc_id -> (article, term_freqs, doc_len, added_at), oldest first
+        self._docs: "OrderedDict[str, tuple]" = OrderedDict()
+        self._postings: Dict[str, set] = {}
+        self._total_len = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._docs)
+    
+    def _remove(self, doc_id: str):
+        _, term_freqs, doc_len, _ = self._docs.pop(doc_id)
+        self._total_len -= doc_len
+        for token in term_freqs:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[token]
+    
+    def _prune(self, now: float):
+        while self._docs:
+            doc_id, (_, _, _, added_at) = next(iter(self._docs.items()))
+            if len(self._docs) > self.max_docs or now - added_at > self.max_age_seconds:
+                self._remove(doc_id)
+            else:
+                break
+    
+    def add_articles(self, articles: List[Dict]):
+        """Index feed articles (re-adding an entry refreshes it)"""
+        now = time.monotonic()
+        with self._lock:
+            for article in articles:
+                doc_id = article.get("entry_id") or article.get("url")
+                if not doc_id:
+                    continue
+                if doc_id in self._docs:
+                    self._remove(doc_id)
+                
+                # Title terms count twice
+                term_freqs = {token: count * 2 for token, count in extract_features(article.get("title", "")).items()}
+                for token, count in extract_features(article.get("content", "")).items():
+                    term_freqs[token] = term_freqs.get(token, 0) + count
+                for token in term_freqs:
+                    self._postings.setdefault(token, set()).add(doc_id)
+                doc_len = sum(term_freqs.values())
+                self._docs[doc_id] = (dict(article), term_freqs, doc_len, now)
+                self._total_len += doc_len
+            self._prune(now)
+    
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Return copies of the best matching articles for a free-text query"""
+        query_tokens = list(extract_features(query))
+        with self._lock:
+            self._prune(time.monotonic())
+            n = len(self._docs)
+            if n == 0 or not query_tokens:
+                return []
+            avgdl = self._total_len / n
+            
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = log((n - len(postings) + 0.5) / (len(postings) + 0.5) + 1)
+                for doc_id in postings:
+                    _, term_freqs, doc_len, _ = self._docs[doc_id]
+                    tf = term_freqs[token]
+                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / denominator
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+            
+            min_matched = self.min_coverage * len(query_tokens)
+            ranked = sorted(
+                ((doc_id, score) for doc_id, score in scores.items() if matched[doc_id] >= min_matched),
+                key=lambda item: (item[1], self._docs[item[0]][0].get("published_at") or datetime.min),
+                reverse=True
+            )[:limit]
+            return [dict(self._docs[doc_id][0]) for doc_id, _ in ranked]
+
+
+# Singleton instance
+_index_instance = None
+_index_lock = threading.Lock()
+
+
+def get_topic_index() -> TopicIndex:
+    """Get singleton topic index"""
+    global _index_instance
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = TopicIndex(
+                    max_docs=settings.TOPIC_INDEX_MAX_DOCS,
+                    max_age_seconds=settings.TOPIC_INDEX_MAX_AGE_HOURS * 3600,
+                    min_coverage=settings.TOPIC_INDEX_MIN_COVERAGE
+                )
+    return _index_instance
+
+
+def warm_topic_index_from_cache(index: TopicIndex) -> int:
+    """Fill an empty index with recently stored news (e.g. right after startup)
+    
+    Uses what the database already has instead of downloading feeds; regular
+    feed fetches and the scheduled poll keep the index filled afterwards.
+    Returns the number of stored articles added.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.TOPIC_INDEX_MAX_AGE_HOURS)
+    db = SessionLocal()
+    try:
+        items = db.query(NewsCache).filter(
+            NewsCache.fetched_at >= cutoff,
+            NewsCache.url != ""
+        ).order_by(NewsCache.fetched_at.asc()).limit(settings.TOPIC_INDEX_MAX_DOCS).all()
+        articles = [
+            {
+                "title": item.title,
+                "url": item.url,
+                "source": item.source,
+                "published_at": item.published_at,
+                "content": item.raw_content or "",
+                "image_url": item.image_url,
+                "entry_id": item.entry_id
+            }
+            for item in items
+        ]
+    except Exception as e:
+        logger.error(f"Failed to warm topic index from stored news: {str(e)}")
+        return 0
+    finally:
+        db.close()
+    
+    index.add_articles(articles)
+    logger.info(f"Warmed topic index with {len(articles)} stored articles")
+    return len(articles)
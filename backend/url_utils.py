@@ -0,0 +1,124 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Optional
+
+# Query parameters that only identify the click / campaign, never the article.
+# Generic names (ref, rss, cmp, amp, ...) are kept: some sites put the article id in them.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "gclsrc", "dclid", "msclkid", "yclid", "twclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+# Mobile host prefixes that serve the same article as the main site
+MOBILE_HOST_PREFIXES = ("m.", "mobile.", "amp.", "wap.")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _strip_amp_path(path: str) -> str:
+    """Remove known AMP path forms: a leading /amp/, a trailing /amp and .amp.html
+    
+    An "amp" segment elsewhere (/r/amp/comments/...) or a path that is only
+    /amp is part of the address and kept.
+    """
+    if path.lower().startswith("/amp/") and path[5:].strip("/"):
+        path = path[4:]
+    else:
+        trimmed = path.rstrip("/")
+        if trimmed.lower().endswith("/amp") and trimmed[:-4].strip("/"):
+            path = trimmed[:-4]
+    if path.lower().endswith(".amp.html"):
+        path = path[:-len(".amp.html")] + ".html"
+    return path
+
+
+def canonicalize_url(url: Optional[str]) -> Optional[str]:
+    """Normalize an article URL so the same article from different links matches
+    
+    Forces https, lowercases the host, drops "www." / mobile / AMP hosts, AMP path
+    markers, tracking query parameters, fragments and trailing slashes, and sorts
+    the remaining query parameters.
+    """
+    if not url:
+        return url
+    
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url.strip()
+    
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") >= 2:
+            host = host[len(prefix):]
+            break
+    # Google AMP cache: example-com.cdn.ampproject.org/c/s/example.com/path
+    if host.endswith(".cdn.ampproject.org"):
+        segments = parts.path.split("/")
+        if len(segments) > 3 and segments[1] == "c":
+            rest = segments[3:] if segments[2] == "s" else segments[2:]
+            query = f"?{parts.query}" if parts.query else ""
+            return canonicalize_url("https://" + "/".join(rest) + query)
+    
+    try:
+        port = parts.port
+    except ValueError:
+        # Malformed port ("http://host:abc/"): leave the URL as it is
+        return url.strip()
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    
+    path = _strip_amp_path(parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+    
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def normalize_feed_url(url: Optional[str]) -> Optional[str]:
+    """Normalize a feed URL so the same feed entered slightly differently matches
+    
+    More conservative than canonicalize_url, since the result is what gets
+    fetched: keeps the scheme, "www." / mobile hosts, path and query order, and
+    only lowercases the host, drops default ports, fragments and utm_* style
+    tracking parameters.
+    """
+    if not url:
+        return url
+    
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return url.strip()
+    
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    if port and not (scheme == "http" and port == 80) and not (scheme == "https" and port == 443):
+        host = f"{host}:{port}"
+    
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
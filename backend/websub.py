@@ -0,0 +1,219 @@
+import hashlib
+import hmac
+import secrets
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+from database import SessionLocal, settings
+from models import WebSubSubscription
+from http_client import get_http_session, http_timeout
+from feed_parsing import parse_feed_articles
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Subscription states
+STATE_DISCOVERED = "discovered"  # 发现了 hub，尚未订阅
+STATE_PENDING = "pending"  # 已向 hub 发送订阅请求，等待验证
+STATE_VERIFIED = "verified"  # hub 已验证，推送生效中
+STATE_UNSUBSCRIBED = "unsubscribed"  # 已取消订阅（不再有主题引用该RSS源）
+STATE_DENIED = "denied"  # hub 拒绝了订阅
+STATE_FAILED = "failed"  # 订阅请求失败
+
+# Retry failed / unanswered subscription requests after this long
+RETRY_AFTER = timedelta(hours=6)
+
+_SIGNATURE_ALGORITHMS = {"sha1", "sha256", "sha384", "sha512"}
+
+# feed_url -> (hub_url, topic_url) already stored, avoids a DB write per fetch
+_known_hubs: Dict[str, tuple] = {}
+_known_hubs_lock = threading.Lock()
+
+
+def websub_enabled() -> bool:
+    return settings.WEBSUB_ENABLED and bool(settings.PUBLIC_BASE_URL)
+
+
+def callback_url(subscription: WebSubSubscription) -> str:
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/api/news/websub/{subscription.callback_token}"
+
+
+def note_feed_hub(feed_url: str, body_links: Dict[str, str], header_links: Dict):
+    """Remember the hub a fetched feed advertises (Link headers or <atom:link rel="hub">)
+    
+    With WEBSUB_HUB_OVERRIDE set every feed is treated as using that hub,
+    e.g. a local stand-in hub for testing.
+    """
+    if not websub_enabled():
+        return
+    
+    hub_url = settings.WEBSUB_HUB_OVERRIDE or header_links.get("hub", {}).get("url") or body_links.get("hub")
+    if not hub_url:
+        return
+    topic_url = header_links.get("self", {}).get("url") or body_links.get("self") or feed_url
+    
+    with _known_hubs_lock:
+        if _known_hubs.get(feed_url) == (hub_url, topic_url):
+            return
+    
+    db = SessionLocal()
+    try:
+        subscription = db.query(WebSubSubscription).filter(WebSubSubscription.feed_url == feed_url).first()
+        if subscription is None:
+            subscription = WebSubSubscription(
+                feed_url=feed_url,
+                callback_token=secrets.token_urlsafe(24),
+                secret=secrets.token_hex(20)
+            )
+            db.add(subscription)
+        if subscription.hub_url != hub_url or subscription.topic_url != topic_url:
+            subscription.hub_url = hub_url
+            subscription.topic_url = topic_url
+            subscription.state = STATE_DISCOVERED
+            logger.info(f"WebSub hub discovered for {feed_url}: {hub_url}")
+        db.commit()
+        with _known_hubs_lock:
+            _known_hubs[feed_url] = (hub_url, topic_url)
+    except Exception as e:
+        logger.error(f"Failed to save WebSub hub for {feed_url}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def send_subscription_request(db: Session, subscription: WebSubSubscription, mode: str = "subscribe") -> bool:
+    """Ask the hub to (un)subscribe; the hub confirms via the callback GET
+    
+    The new state is committed before the request, since some hubs verify
+    synchronously, before answering 202.
+    """
+    if mode == "unsubscribe":
+        subscription.state = STATE_UNSUBSCRIBED
+    elif subscription.state != STATE_VERIFIED:  # Renewals stay verified meanwhile
+        subscription.state = STATE_PENDING
+    db.commit()
+    
+    data = {
+        "hub.mode": mode,
+        "hub.topic": subscription.topic_url,
+        "hub.callback": callback_url(subscription),
+    }
+    if mode == "subscribe":
+        data["hub.secret"] = subscription.secret
+        data["hub.lease_seconds"] = str(settings.WEBSUB_LEASE_SECONDS)
+    
+    try:
+        response = get_http_session().post(subscription.hub_url, data=data, timeout=http_timeout(settings.NEWS_API_TIMEOUT))
+        if response.status_code in (202, 204):
+            subscription.last_error = None
+            db.commit()
+            return True
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+    except Exception as e:
+        error = str(e)
+    
+    db.refresh(subscription)
+    subscription.last_error = error
+    if mode == "subscribe" and subscription.state == STATE_PENDING:
+        subscription.state = STATE_FAILED
+    db.commit()
+    logger.warning(f"WebSub {mode} request for {subscription.feed_url} failed: {error}")
+    return False
+
+
+def sync_subscriptions(db: Session, feed_urls_in_use: Set[str]) -> Dict[str, int]:
+    """Subscribe newly discovered feeds, renew expiring leases, drop unused feeds"""
+    now = datetime.utcnow()
+    renew_before = now + timedelta(seconds=settings.WEBSUB_RENEW_BEFORE_SECONDS)
+    stats = {"subscribed": 0, "renewed": 0, "unsubscribed": 0}
+    
+    for subscription in db.query(WebSubSubscription).all():
+        state = subscription.state
+        stale = subscription.updated_at is None or subscription.updated_at < now - RETRY_AFTER
+        
+        if subscription.feed_url not in feed_urls_in_use:
+            if state in (STATE_PENDING, STATE_VERIFIED):
+                if send_subscription_request(db, subscription, mode="unsubscribe"):
+                    stats["unsubscribed"] += 1
+            continue
+        
+        if state == STATE_DISCOVERED or (state in (STATE_PENDING, STATE_FAILED, STATE_UNSUBSCRIBED) and stale):
+            if send_subscription_request(db, subscription):
+                stats["subscribed"] += 1
+        elif state == STATE_VERIFIED and (subscription.expires_at is None or subscription.expires_at <= renew_before):
+            if send_subscription_request(db, subscription):
+                stats["renewed"] += 1
+    
+    return stats
+
+
+def verify_intent(db: Session, subscription: WebSubSubscription, params) -> Optional[str]:
+    """Handle the hub's verification GET, returns the challenge to echo (None = reject)"""
+    mode = params.get("hub.mode")
+    
+    if mode == "denied":
+        subscription.state = STATE_DENIED
+        subscription.last_error = params.get("hub.reason") or "denied by hub"
+        db.commit()
+        logger.warning(f"WebSub subscription denied for {subscription.feed_url}: {subscription.last_error}")
+        return ""
+    
+    if params.get("hub.topic") != subscription.topic_url:
+        return None
+    
+    if mode == "subscribe" and subscription.state not in (STATE_UNSUBSCRIBED, STATE_DENIED):
+        lease_seconds = params.get("hub.lease_seconds")
+        subscription.lease_seconds = int(lease_seconds) if lease_seconds and lease_seconds.isdigit() else None
+        subscription.expires_at = (
+            datetime.utcnow() + timedelta(seconds=subscription.lease_seconds)
+            if subscription.lease_seconds else None
+        )
+        subscription.state = STATE_VERIFIED
+        subscription.last_error = None
+        db.commit()
+        logger.info(f"WebSub subscription verified for {subscription.feed_url} (lease: {subscription.lease_seconds}s)")
+        return params.get("hub.challenge", "")
+    
+    if mode == "unsubscribe" and subscription.state == STATE_UNSUBSCRIBED:
+        return params.get("hub.challenge", "")
+    
+    return None
+
+
+def verify_signature(secret: str, body: bytes, signature_header: Optional[str]) -> bool:
+    """Check X-Hub-Signature ("sha256=<hex>") against the subscription secret"""
+    if not secret or not signature_header:
+        return False
+    algorithm, _, signature = signature_header.partition("=")
+    algorithm = algorithm.strip().lower()
+    if algorithm not in _SIGNATURE_ALGORITHMS or not signature:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, getattr(hashlib, algorithm)).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+def accept_push(subscription: WebSubSubscription, body: bytes, signature_header: Optional[str]) -> bool:
+    """Whether pushed content should be ingested
+    
+    Only verified subscriptions with a secret and a matching signature count;
+    pushes for pending, denied or removed subscriptions are ignored.
+    """
+    if subscription.state != STATE_VERIFIED:
+        return False
+    return verify_signature(subscription.secret, body, signature_header)
+
+
+def parse_push(feed_url: str, body: bytes, headers: Optional[Dict] = None) -> List[Dict]:
+    """Pushed content is a (partial) feed document: convert its entries to articles"""
+    articles, _ = parse_feed_articles(body, feed_url, 16, headers, settings.RSS_PARSE_MODE == "stream")
+    return articles
+
+
+def get_push_feeds(db: Session) -> Set[str]:
+    """Feeds with a live WebSub subscription (no need to poll them)"""
+    now = datetime.utcnow()
+    rows = db.query(WebSubSubscription.feed_url, WebSubSubscription.expires_at).filter(
+        WebSubSubscription.state == STATE_VERIFIED
+    ).all()
+    return {feed_url for feed_url, expires_at in rows if expires_at is None or expires_at > now}
@@ -177,6 +177,10 @@ export const subscriptionsAPI = {
 };
 
 // News API
+// 后端缓存的新闻配图（/api/news/image/...）需要加上 API 地址
+export const resolveImageUrl = (url: string): string =>
+  url.startsWith('/api/') ? `${API_URL}${url}` : url;
+
 export const newsAPI = {
   getDashboard: () => api.get('/api/news/dashboard'),
   
@@ -1,7 +1,7 @@
 import { useEffect, useState, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '@/store/authStore';
-import { newsAPI, preferencesAPI } from '@/lib/api';
+import { newsAPI, preferencesAPI, resolveImageUrl } from '@/lib/api';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from '@/components/ui/accordion';
@@ -408,7 +408,7 @@ export default function DashboardPage() {
                             <div className="flex gap-4">
                               {item.image_url && (
                                 <img
-                                  src={item.image_url}
+                                  src={resolveImageUrl(item.image_url)}
                                   alt={item.title}
                                   className="w-20 h-20 sm:w-24 sm:h-24 object-cover rounded-lg flex-shrink-0"
                                   onError={(e) => {